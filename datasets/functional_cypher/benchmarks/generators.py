@@ -0,0 +1,109 @@
+"""Synthetic schemas and instances for benchmarking the functional_cypher utils"""
+
+from typing import Any, List, Dict, Tuple
+import random
+
+DATATYPES = ["STRING", "INTEGER", "FLOAT", "DATE", "BOOLEAN"]
+
+# name: (number of labels, number of node instances)
+SIZES = {
+    "small": (10, 100),
+    "medium": (100, 10_000),
+    "large": (1_000, 100_000),
+    "xlarge": (10_000, 1_000_000),
+    }
+
+
+def make_value(datatype: str,
+               rng: random.Random
+               ) -> Any:
+    """Random property value of a given datatype, in the serialized form of the extracted instances."""
+    if datatype == "STRING":
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(rng.randint(5, 20)))
+    if datatype == "INTEGER":
+        return rng.randint(0, 10_000)
+    if datatype == "FLOAT":
+        return round(rng.uniform(0, 100), 2)
+    if datatype == "DATE":
+        return f"{rng.randint(1950, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return rng.random() < 0.5
+
+
+def make_schema(n_labels: int,
+                props_per_label: int = 5,
+                rels_per_label: int = 2,
+                rel_props: int = 2,
+                seed: int = 0
+                ) -> Dict[str, Any]:
+    """Builds a structured schema in the format of Neo4jSchema.structured_schema."""
+    rng = random.Random(seed)
+    labels = [f"Label{i}" for i in range(n_labels)]
+
+    node_props = {
+        label: [{"property": f"prop{j}", "datatype": DATATYPES[j % len(DATATYPES)]}
+                for j in range(props_per_label)]
+        for label in labels
+        }
+
+    relationships = []
+    rel_props_schema = {}
+    for i, label in enumerate(labels):
+        for k in range(rels_per_label):
+            rtype = f"REL_{i}_{k}"
+            relationships.append({"start": label, "type": rtype, "end": rng.choice(labels)})
+            if rel_props:
+                rel_props_schema[rtype] = [
+                    {"property": f"rprop{j}", "datatype": DATATYPES[j % len(DATATYPES)]}
+                    for j in range(rel_props)]
+
+    return {"node_props": node_props, "rel_props": rel_props_schema, "relationships": relationships}
+
+
+def make_node_instances(jschema: Dict,
+                        n_instances: int,
+                        seed: int = 0
+                        ) -> List[List[Dict]]:
+    """Node instances in the format of Neo4jSchema.extract_node_instances, at least one per label."""
+    rng = random.Random(seed)
+    labels = list(jschema["node_props"])
+    per_label = max(1, n_instances // len(labels))
+
+    return [
+        [{"Instance": {"Label": label,
+                       "properties": {p["property"]: make_value(p["datatype"], rng)
+                                      for p in jschema["node_props"][label]}}}
+         for _ in range(per_label)]
+        for label in labels
+        ]
+
+
+def make_relationship_instances(jschema: Dict,
+                                n_instances: int,
+                                seed: int = 0
+                                ) -> List[List[Dict]]:
+    """Relationship instances in the format of Neo4jSchema.extract_multiple_relationships_instances."""
+    rng = random.Random(seed)
+    rels = jschema["relationships"]
+    per_rel = max(1, n_instances // len(rels))
+
+    def props(entries):
+        return {p["property"]: make_value(p["datatype"], rng) for p in entries}
+
+    return [
+        [{f"{rel['start']}_Start": props(jschema["node_props"][rel["start"]]),
+          rel["type"]: props(jschema["rel_props"].get(rel["type"], [])),
+          f"{rel['end']}_End": props(jschema["node_props"][rel["end"]])}
+         for _ in range(per_rel)]
+        for rel in rels
+        ]
+
+
+def make_apoc_results(jschema: Dict) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Results of the three apoc.meta.data() queries of Neo4jSchema.build_schema for a schema:
+    node properties, relationship properties, relationships."""
+    node_properties = [{"output": {"label": label, "properties": props}}
+                       for label, props in jschema["node_props"].items()]
+    rel_properties = [{"output": {"type": rtype, "properties": props}}
+                      for rtype, props in jschema["rel_props"].items()]
+    relationships = [{"output": rel} for rel in jschema["relationships"]]
+    return node_properties, rel_properties, relationships
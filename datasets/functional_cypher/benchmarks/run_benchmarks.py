@@ -0,0 +1,285 @@
+"""Benchmarks of the functional_cypher utils on synthetic schemas and instances.
+
+Runs without a Neo4j database: the schema build is served by a ReplayBackend.
+The cold import time of the utils modules is measured as well, in fresh interpreters.
+
+Usage (from datasets/functional_cypher):
+    python -m benchmarks.run_benchmarks --sizes small medium --output bench.json
+    python -m benchmarks.run_benchmarks --sizes small medium --skip-imports --baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --sizes small medium --skip-imports --save-baseline benchmarks/baseline.json
+
+benchmarks/baseline.json holds the small and medium timings, without the import times, of the commit
+that stored it. Timings depend on the machine: save a new baseline before comparing on another one.
+"""
+
+from typing import Any, List, Dict, Callable, Optional
+import argparse
+from itertools import cycle, islice
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.generators import (SIZES, make_schema, make_node_instances,
+                                   make_relationship_instances, make_apoc_results)
+
+# Quadratic builders run on capped inputs so that the large sizes stay tractable
+PAIRS_CAP = 2_000
+LABEL_PAIRS_CAP = 1_000
+SUBSCHEMA_CALLS = 1_000
+
+# Fast cases are looped so that every repeat lasts at least this long, below it the timer noise dominates
+MIN_REPEAT_SECONDS = 0.05
+
+# Modules whose cold import time is measured, and the dependencies reported when an import loads them
+IMPORT_MODULES = ["utils", "utils.graph_utils", "utils.utilities", "utils.neo4j_conn",
+                  "utils.neo4j_schema", "utils.pipeline"]
+HEAVY_MODULES = ["neo4j", "pandas", "pyarrow", "pickle"]
+
+
+def time_loops(fn: Callable[[], Any],
+               loops: int
+               ) -> float:
+    """Wall time of loops calls of a function, in seconds."""
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def calibrate_loops(fn: Callable[[], Any],
+                    min_repeat_seconds: float = MIN_REPEAT_SECONDS
+                    ) -> int:
+    """Number of calls per repeat so that a repeat lasts at least min_repeat_seconds.
+    The calibration runs are untimed and warm up the caches."""
+    loops = 1
+    elapsed = time_loops(fn, loops)
+    while elapsed < min_repeat_seconds:
+        loops *= min(10, max(2, int(min_repeat_seconds / max(elapsed, 1e-9)) + 1))
+        elapsed = time_loops(fn, loops)
+    return loops
+
+
+def reference_workload() -> Any:
+    """Fixed pure Python work, timed next to every case to factor out the speed of the machine,
+    which varies by up to 2x over minutes on shared virtual machines."""
+    words = [f"label{i % 97}_prop{i}" for i in range(2_000)]
+    counts: Dict[str, int] = {}
+    for word in words:
+        counts[word.split("_")[0]] = counts.get(word.split("_")[0], 0) + len(word)
+    return sorted(words, key=lambda w: (counts[w.split("_")[0]], w[::-1]))
+
+
+def time_cases(cases: Dict[str, Callable[[], Any]],
+               repeats: int,
+               min_repeat_seconds: float = MIN_REPEAT_SECONDS
+               ) -> Dict[str, Dict[str, float]]:
+    """Times functions, returns for each the min and median wall time per call in seconds,
+    and the median of its time relative to the reference_workload timed just before it.
+    The repeats are interleaved, one round over all the cases at a time, so a slow period
+    of the machine spreads over the cases instead of shifting the median of one of them."""
+    loops = {name: calibrate_loops(fn, min_repeat_seconds) for name, fn in cases.items()}
+    reference_loops = calibrate_loops(reference_workload, min_repeat_seconds)
+    timings: Dict[str, List[float]] = {name: [] for name in cases}
+    relative: Dict[str, List[float]] = {name: [] for name in cases}
+    for _ in range(repeats):
+        for name, fn in cases.items():
+            reference = time_loops(reference_workload, reference_loops) / reference_loops
+            timings[name].append(time_loops(fn, loops[name]) / loops[name])
+            relative[name].append(timings[name][-1] / reference)
+    return {name: {"seconds_min": min(t), "seconds_median": statistics.median(t),
+                   "relative_median": statistics.median(relative[name]), "loops": loops[name]}
+            for name, t in timings.items()}
+
+
+def prompter(*params, **kwargs) -> Dict:
+    """Minimal prompt builder, the cost of the real prompters is not measured."""
+    return {"Question": params[0], "Cypher": params[1] if len(params) > 1 else ""}
+
+
+def write_schema_recording(jschema: Dict, path: str) -> None:
+    """Records the apoc.meta.data() answers for a schema, to build it with a ReplayBackend."""
+    from utils.backends import recording_key, write_recording
+    from utils.neo4j_schema import node_properties_query, rel_properties_query, rel_query
+
+    node_properties, rel_properties, relationships = make_apoc_results(jschema)
+    entries = {}
+    for query, result in [(node_properties_query, node_properties),
+                          (rel_properties_query, rel_properties),
+                          (rel_query, relationships)]:
+        entries[recording_key(query)] = {"query": query, "params": {}, "db": None,
+                                         "elapsed": 0.0, "result": result}
+    write_recording(path, entries)
+
+
+def benchmark_size(size: str,
+                   repeats: int
+                   ) -> List[Dict[str, Any]]:
+    """Runs all the benchmarks on one synthetic size."""
+    from utils.graph_utils import (build_minimal_subschema, parse_node_instances_datatype,
+                                   filter_relationships_instances,
+                                   filter_relationships_with_props_instances, get_nodes_list)
+    from utils.utilities import (get_property_pairs, build_node_sampler,
+                                 build_nodes_property_pairs_sampler, build_nodes_pairs,
+                                 build_relationships_samples, build_relationships_props_samples)
+    from utils.backends import ReplayBackend
+    from utils.neo4j_schema import Neo4jSchema
+
+    n_labels, n_instances = SIZES[size]
+    jschema = make_schema(n_labels)
+    nodes = get_nodes_list(jschema)
+    node_instances = make_node_instances(jschema, n_instances)
+    rel_instances = make_relationship_instances(jschema, n_instances)
+
+    nlist = parse_node_instances_datatype(jschema, node_instances, nodes, "STRING", True)
+    rels = filter_relationships_instances(jschema, rel_instances, "STRING", "INTEGER")
+    rels_props = filter_relationships_with_props_instances(jschema, rel_instances, "STRING", "STRING", "INTEGER")
+    capped = nlist[:PAIRS_CAP]
+    subschema_args = [([[label, "prop0"]], [[rel["type"]]])
+                      for label, rel in islice(zip(cycle(nodes), cycle(jschema["relationships"])),
+                                               SUBSCHEMA_CALLS)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, "schema.json.gz")
+        write_schema_recording(jschema, recording)
+        backend = ReplayBackend(recording)
+
+        cases = {
+            "build_minimal_subschema": lambda: [build_minimal_subschema(jschema, n, r, True, False, True)
+                                                for n, r in subschema_args],
+            "parse_node_instances_datatype": lambda: parse_node_instances_datatype(
+                jschema, node_instances, nodes, "STRING", True),
+            "filter_relationships_with_props_instances": lambda: filter_relationships_with_props_instances(
+                jschema, rel_instances, "STRING", "STRING", "INTEGER"),
+            "get_property_pairs": lambda: get_property_pairs(capped, capped, same_node=True, allow_repeats=False),
+            "build_node_sampler": lambda: build_node_sampler(nlist, prompter, allow_repeats=True),
+            "build_nodes_property_pairs_sampler": lambda: build_nodes_property_pairs_sampler(
+                capped, capped, prompter, same_node=True, allow_repeats=False),
+            "build_nodes_pairs": lambda: build_nodes_pairs(nodes[:LABEL_PAIRS_CAP], prompter, allow_repeats=True),
+            "build_relationships_samples": lambda: build_relationships_samples(rels, prompter, allow_repeats=True),
+            "build_relationships_props_samples": lambda: build_relationships_props_samples(
+                rels_props, prompter, allow_repeats=True),
+            "schema_build_replay": lambda: Neo4jSchema(conn=backend),
+            }
+
+        results = []
+        for name, timing in time_cases(cases, repeats).items():
+            results.append({"name": name, "size": size, "labels": n_labels,
+                            "instances": n_instances, "repeats": repeats, **timing})
+            print(f"{size:>7} {name:<45} {timing['seconds_median']:.4f}s", file=sys.stderr)
+    return results
+
+
+#### Import time ####
+
+def time_import(module: str,
+                repeats: int
+                ) -> Optional[Dict[str, Any]]:
+    """Cold import time of a module, each repeat in a fresh interpreter.
+    Returns None if the module cannot be imported."""
+    code = ("import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "seconds = time.perf_counter() - start\n"
+            f"print(json.dumps([seconds, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))")
+    timings = []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        seconds, loaded = json.loads(proc.stdout.splitlines()[-1])
+        timings.append(seconds)
+    return {"seconds_min": min(timings), "seconds_median": statistics.median(timings), "loaded": loaded}
+
+
+def benchmark_imports(repeats: int) -> List[Dict[str, Any]]:
+    """Import time of the IMPORT_MODULES, reported with size 'import'."""
+    results = []
+    for module in IMPORT_MODULES:
+        timing = time_import(module, repeats)
+        if timing is None:
+            print(f"{'import':>7} {module:<45} failed, skipped", file=sys.stderr)
+            continue
+        results.append({"name": f"import {module}", "size": "import", "repeats": repeats, **timing})
+        print(f"{'import':>7} {module:<45} {timing['seconds_median']:.4f}s", file=sys.stderr)
+    return results
+
+
+#### Baseline comparison ####
+
+def compare_with_baseline(results: List[Dict],
+                          baseline: List[Dict],
+                          tolerance: float,
+                          min_seconds: float = 1e-3
+                          ) -> List[Dict[str, Any]]:
+    """Compares the median timings with a baseline, relative to the reference_workload when both runs
+    measured it. A ratio above 1 + tolerance is a regression, unless the current timing is below
+    min_seconds where the timer noise dominates."""
+    reference = {(r["name"], r["size"]): r for r in baseline}
+    comparison = []
+    for r in results:
+        base = reference.get((r["name"], r["size"]))
+        if not base:
+            continue
+        key = "relative_median" if "relative_median" in r and "relative_median" in base else "seconds_median"
+        ratio = r[key] / base[key]
+        comparison.append({"name": r["name"], "size": r["size"], "baseline": base["seconds_median"],
+                           "current": r["seconds_median"], "ratio": ratio,
+                           "regression": ratio > 1 + tolerance and r["seconds_median"] >= min_seconds})
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=list(SIZES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="json file for the results, stdout if omitted")
+    parser.add_argument("--baseline", default=None, help="json results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown before a regression")
+    parser.add_argument("--min-seconds", type=float, default=1e-3, help="timings below are never regressions")
+    parser.add_argument("--save-baseline", default=None, help="also write the results as a new baseline")
+    parser.add_argument("--skip-imports", action="store_true", help="do not measure the import times")
+    args = parser.parse_args(argv)
+
+    results = [] if args.skip_imports else benchmark_imports(args.repeats)
+    for size in args.sizes:
+        results.extend(benchmark_size(size, args.repeats))
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+        }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)["results"]
+        report["comparison"] = compare_with_baseline(results, baseline, args.tolerance, args.min_seconds)
+        regressions = [c for c in report["comparison"] if c["regression"]]
+        for c in regressions:
+            print(f"REGRESSION {c['size']} {c['name']}: {c['ratio']:.2f}x", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fp:
+            fp.write(output)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Builds the SFT functional dataset from the command line, with cached stages.
+
+The stages of SFT_Functional_Data_Builder.ipynb (schema, instances, parsed buckets,
+prompter families, write) are cached under a hash of their inputs and code version,
+so a rerun only recomputes what changed, e.g. a new or edited family.
+With --regenerate, only the samples depending on schema elements changed since --old-schema
+are rebuilt and spliced into the given shards, which must be built with --record-dependencies.
+
+Usage (from datasets/functional_cypher):
+    NEO4J_PASSWORD=... python build_sft_dataset.py --url neo4j+s://... --output trainer.json
+    python build_sft_dataset.py --replay recording.json.gz --output trainer.json --only match_one_node_one_prop
+    python build_sft_dataset.py --url ... --output trainer.json --record-dependencies --schema-out schema.json
+    python build_sft_dataset.py --url ... --refresh --regenerate trainer.json --old-schema schema.json \
+        --output regenerated/ --schema-out schema.json
+"""
+
+from typing import List, Optional
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.pipeline import (SYSTEM_MESSAGE, fingerprint, file_digest, load_families,
+                            run_pipeline, print_summary)
+from utils import instrumentation
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.environ.get("NEO4J_URI"), help="defaults to $NEO4J_URI")
+    parser.add_argument("--username", default="neo4j")
+    parser.add_argument("--password", default=os.environ.get("NEO4J_PASSWORD"), help="defaults to $NEO4J_PASSWORD")
+    parser.add_argument("--database", default="neo4j")
+    parser.add_argument("--replay", default=None, help="recording served instead of a database")
+    parser.add_argument("--record", default=None, help="also record the database answers to this file")
+    parser.add_argument("--output", required=True, help="json file of the samples, directory with --regenerate")
+    parser.add_argument("--cache-dir", default=".sft_cache")
+    parser.add_argument("--families", default="sft_families", help="module exposing FAMILIES")
+    parser.add_argument("--only", nargs="+", default=None, help="names of the families to run")
+    parser.add_argument("--node-instances", type=int, default=12)
+    parser.add_argument("--rels-instances", type=int, default=12)
+    parser.add_argument("--no-repeats", action="store_true", help="same as ALLOW_REPEATS = False")
+    parser.add_argument("--max-samples", type=int, default=500, help="maximum samples per family (M)")
+    parser.add_argument("--system-message", default=SYSTEM_MESSAGE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--refresh", action="store_true", help="extract the schema and instances again")
+    parser.add_argument("--profile", default=None, help="write the per-stage profile to this json file")
+    parser.add_argument("--record-dependencies", action="store_true",
+                        help="store the schema elements of each sample, needed by --regenerate")
+    parser.add_argument("--schema-out", default=None, help="write the structured schema to this json file")
+    parser.add_argument("--regenerate", nargs="+", default=None, metavar="SHARD",
+                        help="rebuild only the samples of these shards affected by the schema changes")
+    parser.add_argument("--old-schema", default=None, help="structured schema the shards were built from")
+    args = parser.parse_args(argv)
+
+    if args.replay is None and args.url is None:
+        parser.error("either --url or --replay is required")
+    if args.regenerate is not None and args.old_schema is None:
+        parser.error("--regenerate requires --old-schema")
+
+    families = load_families(args.families, args.only)
+    if args.profile:
+        instrumentation.enable()
+
+    backend = None
+
+    def schema_factory():
+        nonlocal backend
+        from utils.neo4j_schema import Neo4jSchema
+
+        if args.replay is not None:
+            from utils.backends import ReplayBackend
+            backend = ReplayBackend(args.replay)
+        else:
+            from utils.neo4j_conn import Neo4jGraph
+            backend = Neo4jGraph(args.url, args.username, args.password, args.database)
+            if args.record is not None:
+                from utils.backends import RecordingBackend
+                backend = RecordingBackend(backend, args.record)
+        return Neo4jSchema(conn=backend)
+
+    if args.replay is not None:
+        source_id = fingerprint("replay", file_digest(args.replay))
+    else:
+        source_id = fingerprint("neo4j", args.url, args.database)
+
+    options = {"node_instances_size": args.node_instances,
+               "rels_instances_size": args.rels_instances,
+               "allow_repeats": not args.no_repeats,
+               "sample_max": args.max_samples,
+               "system_message": args.system_message,
+               "seed": args.seed,
+               "refresh": args.refresh,
+               "schema_path": args.schema_out}
+
+    try:
+        if args.regenerate is not None:
+            from utils.schema_diff import regenerate
+
+            with open(args.old_schema) as fp:
+                old_schema = json.load(fp)
+            report = regenerate(source_id, schema_factory, families, old_schema, args.regenerate,
+                                args.output, args.cache_dir, **options)
+        else:
+            summary = run_pipeline(source_id, schema_factory, families, args.output, args.cache_dir,
+                                   record_dependencies=args.record_dependencies, **options)
+    finally:
+        if backend is not None:
+            backend.close()
+
+    if args.regenerate is not None:
+        print(json.dumps({key: report[key] for key in ("diff", "families", "shards")}, indent=2))
+    else:
+        print_summary(summary)
+    if args.profile:
+        instrumentation.write_report(args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Helpers of the functional Cypher data builder.
+
+The public names below are loaded from their submodule on first access (PEP 562),
+so importing the package, or a light submodule such as graph_utils, does not load
+the Neo4j driver, pandas or the other heavy dependencies.
+"""
+
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    # Graph connectors and schema extraction
+    "Neo4jGraph": "neo4j_conn",
+    "Neo4jSchema": "neo4j_schema",
+    "GraphBackend": "backends",
+    "RecordingBackend": "backends",
+    "ReplayBackend": "backends",
+    "acquire_driver": "driver_registry",
+    "PlanBudget": "preflight",
+    "QueryScheduler": "scheduler",
+    "QueryResult": "scheduler",
+    "JobHandle": "scheduler",
+    "Harvester": "harvester",
+    "harvest_databases": "harvester",
+    # Schema and instances parsers
+    "get_nodes_list": "graph_utils",
+    "retrieve_datatypes": "graph_utils",
+    "serialize_nodes_data": "graph_utils",
+    "serialize_relationships_data": "graph_utils",
+    "parse_node_instances_datatype": "graph_utils",
+    "filter_relationships_instances": "graph_utils",
+    "filter_relationships_with_props_instances": "graph_utils",
+    "retrieve_instances_with_relationships_props": "graph_utils",
+    "build_minimal_subschema": "graph_utils",
+    # Samplers and files
+    "read_json": "utilities",
+    "write_json": "utilities",
+    "build_label_sampler": "utilities",
+    "build_node_sampler": "utilities",
+    "build_nodes_property_pairs_sampler": "utilities",
+    "build_nodes_pairs": "utilities",
+    "build_relationships_samples": "utilities",
+    "build_relationships_props_samples": "utilities",
+    "collect_samples": "utilities",
+    "run_pipeline": "pipeline",
+    "FamilyContext": "pipeline",
+    "diff_structured_schemas": "schema_diff",
+    "regenerate": "schema_diff",
+    # Datasets
+    "SchemaIndex": "cypher_validator",
+    "validate_cypher": "cypher_validator",
+    "SchemaRetriever": "schema_retrieval",
+    "NearDuplicateIndex": "dedup",
+    "deduplicate_shards": "dedup",
+    "load_synthetic_datasets": "synthetic_datasets",
+    "scan_synthetic_datasets": "synthetic_datasets",
+    }
+
+_SUBMODULES = {
+    "backends", "cypher_validator", "dedup", "driver_registry", "graph_utils", "harvester",
+    "instrumentation", "neo4j_conn", "neo4j_schema", "pipeline", "preflight", "scheduler",
+    "schema_diff", "schema_retrieval", "synthetic_datasets", "utilities",
+    }
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
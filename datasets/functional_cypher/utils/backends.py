@@ -0,0 +1,181 @@
+"""Graph backends: a common interface, a recorder and an offline replay backend"""
+
+from typing import Any, List, Dict, Optional, Union
+from abc import ABC, abstractmethod
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+# Version 2 keys the entries on the exact query text
+RECORDING_VERSION = 2
+
+
+class GraphBackend(ABC):
+    """Interface shared by the graph connectors.
+    A backend answers Cypher queries with a list of dictionaries and exposes the schema string."""
+
+    schema: str = ""
+
+    @abstractmethod
+    def query(self,
+              cypher_query: str,
+              params: dict = {},
+              db=None,
+              **kwargs
+              ) -> List[Dict[str, Any]]:
+        """Runs a query and returns its records as dictionaries."""
+
+    def close(self) -> None:
+        pass
+
+
+#### Recording format ####
+
+def recording_key(cypher_query: str,
+                  params: dict = {},
+                  db=None
+                  ) -> str:
+    """Key of a (query, params, database) triple in a recording.
+    The query text is used as is: normalizing the whitespace would also merge queries
+    that only differ inside a string literal."""
+    payload = json.dumps([cypher_query, params, db],
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def to_jsonable(value: Any) -> Any:
+    """Fallback JSON encoder for driver values.
+    neo4j.time values use the same string format as serialize_nodes_data."""
+    name = type(value).__name__
+    if type(value).__module__.startswith("neo4j.time"):
+        from utils.graph_utils import neo4j_date_to_string, neo4j_datetime_to_string
+        if name == "Date":
+            return neo4j_date_to_string(value)
+        if name == "DateTime":
+            return neo4j_datetime_to_string(value)
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    return str(value)
+
+
+def write_recording(path: str,
+                    entries: Dict[str, Dict],
+                    schema: str = ""
+                    ) -> None:
+    """Writes the recorded entries to a gzip compressed json file."""
+    with gzip.open(path, "wt", encoding="utf-8") as fp:
+        json.dump({"version": RECORDING_VERSION, "schema": schema, "entries": entries},
+                  fp, default=to_jsonable, separators=(",", ":"))
+
+
+def read_recording(path: str) -> Dict[str, Any]:
+    """Reads a recording written by write_recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        recording = json.load(fp)
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version in {path}.")
+    return recording
+
+
+#### Backends ####
+
+class RecordingBackend(GraphBackend):
+    """Wraps a live backend and records (query, params) -> results for offline replay.
+    The wrapped backend can be any connector with a query(cypher_query, params) method,
+    e.g. the langchain Neo4jGraph of the evaluation harness: db and the other keyword arguments
+    are only forwarded when they are set."""
+
+    def __init__(self,
+                 backend: Any,
+                 path: str,
+                 ) -> None:
+        self.backend = backend
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def schema(self) -> str:
+        return getattr(self.backend, "schema", "")
+
+    def query(self,
+              cypher_query: str,
+              params: dict = {},
+              db=None,
+              **kwargs
+              ) -> List[Dict[str, Any]]:
+        """Runs the query on the wrapped backend and records the results.
+        The results are recorded as an encoded copy, the caller may modify the returned data in place."""
+        if db is not None:
+            kwargs["db"] = db
+        start = time.perf_counter()
+        data = self.backend.query(cypher_query, params, **kwargs)
+        elapsed = time.perf_counter() - start
+        result = json.loads(json.dumps(data, default=to_jsonable))
+
+        with self._lock:
+            self.entries[recording_key(cypher_query, params, db)] = {
+                "query": cypher_query,
+                "params": params,
+                "db": db,
+                "elapsed": elapsed,
+                "result": result,
+                }
+        return data
+
+    def save(self) -> None:
+        """Writes the recording to file."""
+        with self._lock:
+            write_recording(self.path, self.entries, self.schema)
+
+    def close(self) -> None:
+        """Saves the recording and closes the wrapped backend."""
+        self.save()
+        self.backend.close()
+
+
+class ReplayBackend(GraphBackend):
+    """Serves recorded results from memory, no database needed.
+
+    latency:
+    - None: answer immediately
+    - a number: sleep that many seconds per query
+    - "recorded": sleep the time the query took when it was recorded
+    """
+
+    def __init__(self,
+                 path: str,
+                 latency: Optional[Union[float, str]] = None,
+                 ) -> None:
+        recording = read_recording(path)
+        self.schema = recording.get("schema", "")
+        self.latency = latency
+
+        # Results are kept encoded so every call returns fresh objects,
+        # the parsers in graph_utils modify the instances in place
+        self._results = {key: json.dumps(entry["result"]) for key, entry in recording["entries"].items()}
+        self._elapsed = {key: entry.get("elapsed", 0.0) for key, entry in recording["entries"].items()}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def query(self,
+              cypher_query: str,
+              params: dict = {},
+              db=None,
+              **kwargs
+              ) -> List[Dict[str, Any]]:
+        """Returns the recorded results of the query."""
+        key = recording_key(cypher_query, params, db)
+        if key not in self._results:
+            raise ValueError(
+                "The query was not recorded\n" f"{cypher_query}")
+
+        if self.latency == "recorded":
+            time.sleep(self._elapsed[key])
+        elif self.latency:
+            time.sleep(self.latency)
+
+        return json.loads(self._results[key])
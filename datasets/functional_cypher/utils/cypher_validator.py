@@ -0,0 +1,252 @@
+"""Offline validation of Cypher queries against a structured_schema"""
+
+from typing import List, Dict, Iterable, Optional, Set, Tuple, Union
+import ast
+import csv
+import json
+import re
+
+# Import local modules
+from utils.preflight import strip_comments
+
+#### Schema index ####
+
+def load_structured_schema(schema: Union[str, Dict]) -> Dict:
+    """Returns the structured_schema as a dictionary.
+    Strings can be json or the Python literal stored in the text2cypher_schemas.csv files."""
+    if isinstance(schema, dict):
+        return schema
+    try:
+        return json.loads(schema)
+    except ValueError:
+        return ast.literal_eval(schema)
+
+
+class SchemaIndex:
+    """Lookup tables for the labels, relationship types, directions and properties of a schema."""
+
+    def __init__(self, structured_schema: Union[str, Dict]) -> None:
+        jschema = load_structured_schema(structured_schema)
+
+        self.node_props: Dict[str, Set[str]] = {
+            label: {p["property"] for p in props}
+            for label, props in jschema.get("node_props", {}).items()
+            }
+        self.rel_props: Dict[str, Set[str]] = {
+            rtype: {p["property"] for p in props}
+            for rtype, props in jschema.get("rel_props", {}).items()
+            }
+        self.triples: Set[Tuple[str, str, str]] = {
+            (r["start"], r["type"], r["end"]) for r in jschema.get("relationships", [])
+            }
+
+        self.labels: Set[str] = set(self.node_props)
+        self.labels.update(t[0] for t in self.triples)
+        self.labels.update(t[2] for t in self.triples)
+        self.rel_types: Set[str] = {t[1] for t in self.triples} | set(self.rel_props)
+
+
+def load_schema_indexes(csv_path: str) -> Dict[str, SchemaIndex]:
+    """Builds a SchemaIndex per database from a text2cypher_schemas.csv file."""
+    csv.field_size_limit(2**31 - 1)
+    with open(csv_path, newline="", encoding="utf-8") as fp:
+        return {row["database"]: SchemaIndex(row["structured_schema"]) for row in csv.DictReader(fp)}
+
+
+#### Pattern extraction ####
+
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+NAME = r"(?:`[^`]+`|\w+)"
+
+NODE = re.compile(
+    r"\(\s*(?P<var>\w+)?\s*(?P<labels>(?::\s*!?" + NAME + r"\s*(?:[|&]\s*!?" + NAME + r"\s*)*)*)"
+    r"(?P<props>\{[^{}]*\})?\s*\)")
+
+REL = re.compile(
+    r"(?P<left><?-)\s*(?:\[\s*(?P<var>\w+)?\s*(?P<types>(?::\s*!?" + NAME + r"\s*(?:\|:?\s*!?" + NAME + r"\s*)*)?)"
+    r"(?P<length>\*[\d\s.]*)?\s*(?P<props>\{[^{}]*\})?\s*\])?\s*(?P<right>->?)")
+
+PROPERTY_ACCESS = re.compile(r"(?<![\w.$])([A-Za-z_]\w*)\.(`[^`]+`|[A-Za-z_]\w*)")
+MAP_KEY = re.compile(r"(`[^`]+`|\w+)\s*:")
+
+
+def _names(expression: Optional[str]) -> List[str]:
+    """Splits a label or type expression such as ':A:B', ':A|B' or ':!A' into names."""
+    if not expression:
+        return []
+    return [n.strip("`") for n in re.split(r"[:|&!\s]+", expression) if n]
+
+
+def _map_keys(props: Optional[str]) -> List[str]:
+    if not props:
+        return []
+    return [k.strip("`") for k in MAP_KEY.findall(props[1:-1])]
+
+
+def strip_literals(cypher_query: str) -> str:
+    """Removes the // and /* */ comments and replaces string literals with empty strings,
+    so that the patterns are not matched inside them."""
+    return STRING_LITERAL.sub("''", strip_comments(cypher_query))
+
+
+def extract_patterns(cypher_query: str) -> Tuple[List[Dict], List[Dict]]:
+    """Extracts the node patterns and the relationship patterns of a query.
+    Relationship patterns reference the indexes of their left and right nodes."""
+
+    query = strip_literals(cypher_query)
+    nodes: List[Dict] = []
+    rels: List[Dict] = []
+
+    pos = 0
+    while True:
+        start = query.find("(", pos)
+        if start < 0:
+            break
+        # Skip function calls such as count(n)
+        if start > 0 and (query[start - 1].isalnum() or query[start - 1] == "_"):
+            pos = start + 1
+            continue
+        m = NODE.match(query, start)
+        if not m:
+            pos = start + 1
+            continue
+
+        nodes.append({"var": m.group("var"), "labels": _names(m.group("labels")),
+                      "props": _map_keys(m.group("props"))})
+        pos = m.end()
+
+        # Follow the chain (a)-[r]->(b)<-[s]-(c)...
+        while True:
+            r = REL.match(query, pos)
+            if not r:
+                break
+            n = NODE.match(query, r.end())
+            if not n:
+                break
+            left, right = r.group("left"), r.group("right")
+            if left.startswith("<") and not right.endswith(">"):
+                direction = "<-"
+            elif right.endswith(">") and not left.startswith("<"):
+                direction = "->"
+            else:
+                direction = "--"
+            nodes.append({"var": n.group("var"), "labels": _names(n.group("labels")),
+                          "props": _map_keys(n.group("props"))})
+            rels.append({"var": r.group("var"), "types": _names(r.group("types")),
+                         "props": _map_keys(r.group("props")), "direction": direction,
+                         "left": len(nodes) - 2, "right": len(nodes) - 1})
+            pos = n.end()
+
+    return nodes, rels
+
+
+#### Validation ####
+
+def _issue(kind: str, element: str, message: str) -> Dict[str, str]:
+    return {"kind": kind, "element": element, "message": message}
+
+
+def validate_cypher(cypher_query: str,
+                    index: SchemaIndex
+                    ) -> List[Dict[str, str]]:
+    """Checks a query against the schema index, without a database.
+    Returns a list of issues with keys: kind, element, message.
+    The kinds are unknown_label, unknown_relationship, wrong_direction,
+    unknown_pattern and unknown_property. An empty list means no issue was found."""
+
+    nodes, rels = extract_patterns(cypher_query)
+    issues = []
+
+    # Bind variables to labels and types
+    node_vars: Dict[str, Set[str]] = {}
+    for node in nodes:
+        if node["var"]:
+            node_vars.setdefault(node["var"], set()).update(node["labels"])
+    rel_vars: Dict[str, Set[str]] = {}
+    for rel in rels:
+        if rel["var"]:
+            rel_vars.setdefault(rel["var"], set()).update(rel["types"])
+
+    def labels_of(node: Dict) -> Set[str]:
+        labels = set(node["labels"])
+        if node["var"]:
+            labels |= node_vars.get(node["var"], set())
+        return labels & index.labels
+
+    for label in {label for node in nodes for label in node["labels"]}:
+        if label not in index.labels:
+            issues.append(_issue("unknown_label", label, f"Unknown node label {label}"))
+
+    for rtype in {rtype for rel in rels for rtype in rel["types"]}:
+        if rtype not in index.rel_types:
+            issues.append(_issue("unknown_relationship", rtype, f"Unknown relationship type {rtype}"))
+
+    # Directions of the relationship patterns
+    for rel in rels:
+        left, right = labels_of(nodes[rel["left"]]), labels_of(nodes[rel["right"]])
+        if rel["direction"] == "<-":
+            left, right = right, left
+        for rtype in rel["types"]:
+            if rtype not in index.rel_types:
+                continue
+            starts = left or {t[0] for t in index.triples if t[1] == rtype}
+            ends = right or {t[2] for t in index.triples if t[1] == rtype}
+            if any((s, rtype, e) in index.triples for s in starts for e in ends):
+                continue
+            if rel["direction"] == "--":
+                if any((e, rtype, s) in index.triples for s in starts for e in ends):
+                    continue
+            elif any((e, rtype, s) in index.triples for s in starts for e in ends):
+                issues.append(_issue("wrong_direction", rtype,
+                                     f"Wrong direction for {rtype} between {sorted(starts)} and {sorted(ends)}"))
+                continue
+            if left or right:
+                issues.append(_issue("unknown_pattern", rtype,
+                                     f"No {rtype} relationship between {sorted(starts)} and {sorted(ends)}"))
+
+    # Properties in pattern maps
+    for node in nodes:
+        for label in labels_of(node):
+            for prop in node["props"]:
+                if prop not in index.node_props.get(label, set()):
+                    issues.append(_issue("unknown_property", f"{label}.{prop}",
+                                         f"Unknown property {prop} for {label}"))
+    for rel in rels:
+        for rtype in rel["types"]:
+            for prop in rel["props"]:
+                if rtype in index.rel_types and prop not in index.rel_props.get(rtype, set()):
+                    issues.append(_issue("unknown_property", f"{rtype}.{prop}",
+                                         f"Unknown property {prop} for {rtype}"))
+
+    # Properties accessed through variables, e.g. n.title
+    seen = set()
+    for var, prop in PROPERTY_ACCESS.findall(strip_literals(cypher_query)):
+        prop = prop.strip("`")
+        if (var, prop) in seen:
+            continue
+        seen.add((var, prop))
+        if var in node_vars:
+            labels = node_vars[var] & index.labels
+            if labels and not any(prop in index.node_props.get(label, set()) for label in labels):
+                issues.append(_issue("unknown_property", f"{var}.{prop}",
+                                     f"Unknown property {prop} for {sorted(labels)}"))
+        elif var in rel_vars:
+            rtypes = rel_vars[var] & index.rel_types
+            if rtypes and not any(prop in index.rel_props.get(rtype, set()) for rtype in rtypes):
+                issues.append(_issue("unknown_property", f"{var}.{prop}",
+                                     f"Unknown property {prop} for {sorted(rtypes)}"))
+
+    return issues
+
+
+def validate_many(queries: Iterable[Tuple[str, str]],
+                  indexes: Dict[str, SchemaIndex]
+                  ) -> List[List[Dict[str, str]]]:
+    """Validates (database, cypher) pairs with the schema index of each database.
+    Queries of databases without a schema index get an empty list of issues."""
+    results = []
+    for database, cypher_query in queries:
+        index = indexes.get(database)
+        results.append(validate_cypher(cypher_query, index) if index is not None else [])
+    return results
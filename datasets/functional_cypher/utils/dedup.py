@@ -0,0 +1,212 @@
+"""Near-duplicate detection of Question/Cypher samples with MinHash and LSH"""
+
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import struct
+
+MAX_HASH = (1 << 32) - 1
+
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+#### Normalization ####
+
+def normalize_text(text: str,
+                   mask_literals: bool = False
+                   ) -> List[str]:
+    """Lowercases and tokenizes a question or a Cypher query.
+    With mask_literals, string and number literals are replaced by placeholders,
+    so samples that only differ by their values become duplicates."""
+    if mask_literals:
+        text = STRING_LITERAL.sub(" STR ", text)
+        text = NUMBER.sub(" NUM ", text)
+    return TOKEN.findall(text.lower())
+
+
+def shingles(tokens: List[str],
+             size: int
+             ) -> List[bytes]:
+    """Returns the token n-grams of a text, the text itself if it is shorter than the n-gram size."""
+    if len(tokens) <= size:
+        return [" ".join(tokens).encode("utf-8")]
+    return [" ".join(tokens[i:i + size]).encode("utf-8") for i in range(len(tokens) - size + 1)]
+
+
+def sample_shingles(sample: Dict,
+                    keys: Tuple[str, ...] = ("Question", "Cypher"),
+                    size: int = 3,
+                    mask_literals: bool = False
+                    ) -> List[bytes]:
+    """Shingles of the selected fields of a sample, prefixed by the field name."""
+    result = []
+    for key in keys:
+        tokens = normalize_text(str(sample.get(key, "")), mask_literals)
+        result.extend(key.encode("utf-8") + b":" + s for s in shingles(tokens, size))
+    return result
+
+
+#### MinHash with banded LSH ####
+
+class MinHasher:
+    """Computes MinHash signatures of num_perm hash functions.
+    The hash functions are the 32-bit words of one seeded SHAKE-128 digest per shingle,
+    and the minimum of every hash function is taken in C by map/zip."""
+
+    def __init__(self,
+                 num_perm: int = 64,
+                 seed: int = 1,
+                 ) -> None:
+        self.num_perm = num_perm
+        self._seed = hashlib.shake_128(seed.to_bytes(8, "little"))
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+
+    def _hashes(self, item: bytes) -> Tuple[int, ...]:
+        h = self._seed.copy()
+        h.update(item)
+        return self._unpack(h.digest(4 * self.num_perm))
+
+    def signature(self, items: Iterable[bytes]) -> List[int]:
+        rows = [self._hashes(item) for item in set(items)]
+        if not rows:
+            return [MAX_HASH] * self.num_perm
+        return list(map(min, zip(*rows)))
+
+
+class NearDuplicateIndex:
+    """Streaming near-duplicate filter.
+    The first sample of a cluster is kept, every later sample sharing an LSH band
+    with a kept sample is dropped and recorded in its cluster.
+
+    With b bands of r rows, pairs with Jaccard similarity above about (1/b)^(1/r)
+    are likely to collide; the defaults (8 bands of 8 rows) target about 0.77."""
+
+    def __init__(self,
+                 num_perm: int = 64,
+                 bands: int = 8,
+                 shingle_size: int = 3,
+                 keys: Tuple[str, ...] = ("Question", "Cypher"),
+                 mask_literals: bool = False,
+                 seed: int = 1,
+                 ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.keys = keys
+        self.mask_literals = mask_literals
+
+        # One dictionary per band: band hash -> id of the kept sample
+        self._buckets: List[Dict[int, Any]] = [{} for _ in range(bands)]
+        self._exact: Dict[bytes, Any] = {}
+        self.clusters: Dict[Any, Dict[str, Any]] = {}
+        self.kept = 0
+        self.dropped = 0
+
+    def add(self,
+            sample_id: Any,
+            sample: Dict
+            ) -> Optional[Any]:
+        """Adds a sample. Returns None if it is kept,
+        or the id of the kept sample it duplicates if it is dropped."""
+
+        exact_key = hashlib.blake2b(
+            json.dumps([str(sample.get(k, "")) for k in self.keys]).encode("utf-8"), digest_size=16).digest()
+        match = self._exact.get(exact_key)
+
+        band_keys = []
+        if match is None:
+            signature = self.hasher.signature(
+                sample_shingles(sample, self.keys, self.shingle_size, self.mask_literals))
+            for i in range(self.bands):
+                band_keys.append(hash(tuple(signature[i * self.rows:(i + 1) * self.rows])))
+                if match is None:
+                    match = self._buckets[i].get(band_keys[i])
+
+        if match is not None:
+            self.dropped += 1
+            cluster = self.clusters.setdefault(match, {"representative": match, "dropped": []})
+            cluster["dropped"].append(sample_id)
+            return match
+
+        self.kept += 1
+        self._exact[exact_key] = sample_id
+        for i, key in enumerate(band_keys):
+            self._buckets[i][key] = sample_id
+        return None
+
+    def report(self) -> Dict[str, Any]:
+        """Summary of the kept and dropped samples, with the dropped clusters."""
+        return {
+            "kept": self.kept,
+            "dropped": self.dropped,
+            "clusters": list(self.clusters.values()),
+            }
+
+
+#### Streaming over shards ####
+
+def read_shard(path: str) -> Iterator[Dict]:
+    """Yields the samples of a shard: a json list, as written by write_json, or json lines."""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as fp:
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8") as fp:
+            yield from json.load(fp)
+
+
+def shard_names(input_paths: List[str]) -> List[str]:
+    """Names of the shards relative to their common directory, e.g. ['a/train.json', 'b/train.json'],
+    so shards with the same file name in different directories keep distinct outputs and sample ids.
+    A single shard is named by its file name."""
+    paths = [os.path.abspath(path) for path in input_paths]
+    if len(set(paths)) < len(paths):
+        raise ValueError("The same shard is given more than once.")
+    root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ""
+    return [os.path.relpath(path, root).replace(os.sep, "/") for path in paths]
+
+
+def deduplicate_samples(samples: Iterable[Tuple[Any, Dict]],
+                        index: Optional[NearDuplicateIndex] = None,
+                        ) -> Iterator[Tuple[Any, Dict]]:
+    """Yields the (id, sample) pairs that are not near-duplicates of an earlier sample."""
+    index = NearDuplicateIndex() if index is None else index
+    for sample_id, sample in samples:
+        if index.add(sample_id, sample) is None:
+            yield sample_id, sample
+
+
+def deduplicate_shards(input_paths: List[str],
+                       output_dir: str,
+                       report_path: Optional[str] = None,
+                       index: Optional[NearDuplicateIndex] = None,
+                       ) -> Dict[str, Any]:
+    """Streams the shards through one index and writes the kept samples of each shard
+    as json lines to output_dir, under their shard_names. Samples are identified as '<shard name>:<position>'.
+    Returns the report, also written to report_path if given."""
+
+    index = NearDuplicateIndex() if index is None else index
+    os.makedirs(output_dir, exist_ok=True)
+
+    for path, name in zip(input_paths, shard_names(input_paths)):
+        out_path = os.path.join(output_dir, os.path.splitext(name)[0] + ".jsonl")
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        samples = ((f"{name}:{i}", sample) for i, sample in enumerate(read_shard(path)))
+        with open(out_path, "w", encoding="utf-8") as fp:
+            for _, sample in deduplicate_samples(samples, index):
+                fp.write(json.dumps(sample) + "\n")
+
+    report = index.report()
+    if report_path is not None:
+        with open(report_path, "w", encoding="utf-8") as fp:
+            json.dump(report, fp)
+    return report
@@ -0,0 +1,170 @@
+"""Process-wide registry of Neo4j drivers shared by the graph wrappers"""
+
+from typing import Any, Dict, Optional, Tuple
+import os
+import threading
+
+# Driver settings used when a wrapper does not set them
+DEFAULT_CONFIG = {
+    "max_connection_pool_size": 100,
+    "fetch_size": 1000,
+    }
+
+Key = Tuple[str, Tuple[str, str]]
+
+
+class _Entry:
+    """A driver with its reference count, created on first use."""
+
+    def __init__(self, url: str, auth: Tuple[str, str], config: Dict[str, Any]) -> None:
+        self.url = url
+        self.auth = auth
+        self.config = config
+        self.refs = 0
+        self.driver = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+
+class DriverHandle:
+    """Reference to a shared driver, returned by DriverRegistry.acquire.
+    The driver is only created, and its connectivity verified, on the first session."""
+
+    def __init__(self, registry: "DriverRegistry", key: Key) -> None:
+        self._registry = registry
+        self.key = key
+        self._closed = False
+
+    @property
+    def driver(self) -> Any:
+        if self._closed:
+            raise ValueError("The Neo4j connection is closed.")
+        return self._registry._driver(self.key)
+
+    def session(self, **kwargs) -> Any:
+        """Opens a session on the shared driver, with the fetch size of the registry entry by default."""
+        driver = self.driver
+        kwargs.setdefault("fetch_size", self._registry._entries[self.key].config["fetch_size"])
+        return driver.session(**kwargs)
+
+    def close(self) -> None:
+        """Releases the reference, the driver is closed with its last reference."""
+        if not self._closed:
+            self._closed = True
+            self._registry.release(self.key)
+
+
+class DriverRegistry:
+    """Drivers keyed by (url, auth). Every wrapper connecting to the same server with the same
+    credentials shares one driver, and so one connection pool.
+
+    The pool size and fetch size of a driver are set by its first acquire, later acquires
+    reuse the driver as is. A driver created before a fork is not reused in the child process,
+    which creates its own."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Key, _Entry] = {}
+
+    def acquire(self,
+                url: str,
+                username: str,
+                password: str,
+                max_connection_pool_size: Optional[int] = None,
+                fetch_size: Optional[int] = None,
+                ) -> DriverHandle:
+        """Returns a handle on the driver of (url, auth), without connecting."""
+        key = (url, (username, password))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                config = dict(DEFAULT_CONFIG)
+                if max_connection_pool_size is not None:
+                    config["max_connection_pool_size"] = max_connection_pool_size
+                if fetch_size is not None:
+                    config["fetch_size"] = fetch_size
+                entry = self._entries[key] = _Entry(url, (username, password), config)
+            entry.refs += 1
+        return DriverHandle(self, key)
+
+    def _driver(self, key: Key) -> Any:
+        entry = self._entries[key]
+        if entry.driver is not None and entry.pid == os.getpid():
+            return entry.driver
+
+        with entry.lock:
+            if entry.driver is None or entry.pid != os.getpid():
+                entry.driver = connect(entry.url, entry.auth, entry.config["max_connection_pool_size"])
+                entry.pid = os.getpid()
+        return entry.driver
+
+    def release(self, key: Key) -> None:
+        """Drops a reference and closes the driver when none is left."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[key]
+
+        if entry.driver is not None and entry.pid == os.getpid():
+            entry.driver.close()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """References and connection state of the registered drivers, by url and username."""
+        with self._lock:
+            return {f"{entry.auth[0]}@{entry.url}": {"refs": entry.refs,
+                                                     "connected": entry.driver is not None,
+                                                     **entry.config}
+                    for entry in self._entries.values()}
+
+
+def connect(url: str,
+            auth: Tuple[str, str],
+            max_connection_pool_size: int,
+            ) -> Any:
+    """Creates a driver and verifies the connectivity."""
+    import neo4j
+
+    driver = neo4j.GraphDatabase.driver(url, auth=auth,
+                                        max_connection_pool_size=max_connection_pool_size)
+    try:
+        driver.verify_connectivity()
+    except neo4j.exceptions.ServiceUnavailable:
+        driver.close()
+        raise ValueError(
+            "Could not connect to Neo4j database. "
+            "Please ensure that the url is correct."
+        )
+    except neo4j.exceptions.AuthError:
+        driver.close()
+        raise ValueError(
+            "Could not connect to Neo4j database. "
+            "Please ensure that the username and password are correct"
+        )
+    return driver
+
+
+REGISTRY = DriverRegistry()
+
+
+def acquire_driver(url: str,
+                   username: str,
+                   password: str,
+                   max_connection_pool_size: Optional[int] = None,
+                   fetch_size: Optional[int] = None,
+                   ) -> DriverHandle:
+    """Handle on the process-wide driver of (url, auth)."""
+    return REGISTRY.acquire(url, username, password, max_connection_pool_size, fetch_size)
+
+
+def configure(max_connection_pool_size: Optional[int] = None,
+              fetch_size: Optional[int] = None,
+              ) -> None:
+    """Sets the defaults of the drivers created from now on."""
+    if max_connection_pool_size is not None:
+        DEFAULT_CONFIG["max_connection_pool_size"] = max_connection_pool_size
+    if fetch_size is not None:
+        DEFAULT_CONFIG["fetch_size"] = fetch_size
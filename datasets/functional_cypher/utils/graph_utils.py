@@ -2,11 +2,33 @@
 
 from typing import Any, List, Dict, Union, Tuple
 import re
-
-from neo4j import time
+import sys
 
 # Import local modules
-from utils.utilities import *
+from utils.utilities import (extract_subdict, filter_dicts_list, filter_empty_dict_values,
+                             filter_empty_sublists, flatten_list)
+from utils.instrumentation import instrumented
+
+__all__ = [
+    "retrieve_datatypes",
+    "get_nodes_list",
+    "get_node_properties",
+    "get_nodes_properties_of_datatype",
+    "extract_relationships_list",
+    "get_relationships_with_datatype",
+    "get_relationships_properties_of_datatype",
+    "neo4j_date_to_string",
+    "neo4j_datetime_to_string",
+    "transform_temporals_in_dict",
+    "serialize_nodes_data",
+    "serialize_relationships_data",
+    "parse_node_instances_datatype",
+    "filter_relationships_instances",
+    "filter_relationships_with_props_instances",
+    "retrieve_instances_with_relationships_props",
+    "build_minimal_subschema",
+    ]
+
 
 def retrieve_datatypes(jschema: Dict,
                             comp: str) -> List[str]:
@@ -138,6 +160,10 @@ def neo4j_datetime_to_string(v: str
 def transform_temporals_in_dict(d: Dict
                                 )-> Dict:
     """Transform neo4j.time objects in a dictionary to ISO formatted strings."""
+    # neo4j.time values only exist once the driver is loaded, it is not imported for them
+    time = sys.modules.get("neo4j.time")
+    if time is None:
+        return d
     for key, value in d.items():
         if isinstance(value, time.Date):
             d[key] = neo4j_date_to_string(value)
@@ -146,6 +172,7 @@ def transform_temporals_in_dict(d: Dict
     return d
 
 
+@instrumented()
 def serialize_nodes_data(entries: List[Dict], 
                         )->List[Dict]:
     """Function to parse the Neo4j.time entries from extracted instances
@@ -157,6 +184,7 @@ def serialize_nodes_data(entries: List[Dict],
     return entries
 
 
+@instrumented()
 def serialize_relationships_data(entries: List[Dict], 
                                  )->List[Dict]:
     """Function to parse the Neo4j.time entries from extracted instances
@@ -173,6 +201,7 @@ def serialize_relationships_data(entries: List[Dict],
 
 #### PARSED INSTANCES ###
 
+@instrumented()
 def parse_node_instances_datatype(jschema: List[Dict],
                                   nodes_instances: List[Dict],
                                   nodes: List[str], 
@@ -211,6 +240,7 @@ def parse_node_instances_datatype(jschema: List[Dict],
         return full_result
     
 
+@instrumented()
 def filter_relationships_instances(jschema: Dict,
                                    rels_instances: List[Dict],
                                    datatype_start: str,
@@ -240,6 +270,7 @@ def filter_relationships_instances(jschema: Dict,
     return result
     
 
+@instrumented()
 def filter_relationships_with_props_instances(jschema: Dict,
                                    instances: List[Dict],
                                    datatype_start: str,
@@ -289,6 +320,7 @@ def filter_relationships_with_props_instances(jschema: Dict,
     return result
 
     
+@instrumented()
 def retrieve_instances_with_relationships_props(relationship_instances: List[Any]
                                                 ) -> List[Any]:
     """Returns the instances where the relationship has attributes."""
@@ -306,6 +338,7 @@ def retrieve_instances_with_relationships_props(relationship_instances: List[Any
 
 #### EXTRACT LOCAL GRAPH INFO ####
 
+@instrumented()
 def build_minimal_subschema(jschema: Dict,
                     nodes_info: List[Tuple[str, Dict[str, str]]],
                     relationships_info: List[Tuple[str, str, str, Dict[str, str]]],
@@ -0,0 +1,216 @@
+"""Concurrent harvesting of schemas and instances from many databases into one store"""
+
+from typing import Any, List, Dict, Callable, Iterable, Optional, Tuple, Union
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import local modules
+from utils.backends import GraphBackend
+from utils.graph_utils import get_nodes_list, serialize_nodes_data, serialize_relationships_data
+
+STORE_VERSION = 1
+
+Auth = Tuple[str, str]
+Target = Tuple[str, str]
+
+
+def demo_auth(url: str, database: str) -> Auth:
+    """Credentials of the Neo4j demo server: the username and password are the database name."""
+    return database, database
+
+
+def targets_from_schemas(path: str,
+                         url: str = "neo4j+s://demo.neo4jlabs.com:7687",
+                         ) -> List[Target]:
+    """(url, database) targets for the databases of a text2cypher_schemas.csv file."""
+    csv.field_size_limit(2**31 - 1)
+    with open(path, newline="", encoding="utf-8") as fp:
+        return [(url, row["database"]) for row in csv.DictReader(fp)]
+
+
+class DatabaseBackend(GraphBackend):
+    """Runs the queries of a shared connector on one database, optionally with its own credentials.
+    Lets Neo4jSchema, which does not pass a database, work on any database of a server."""
+
+    def __init__(self,
+                 backend: Any,
+                 database: str,
+                 auth: Optional[Auth] = None,
+                 ) -> None:
+        self.backend = backend
+        self.database = database
+        self.auth = auth
+
+    def query(self,
+              cypher_query: str,
+              params: dict = {},
+              db=None,
+              **kwargs
+              ) -> List[Dict[str, Any]]:
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+        return self.backend.query(cypher_query, params, db=self.database if db is None else db, **kwargs)
+
+    def terminate_transactions(self, metadata: Dict[str, Any]) -> int:
+        """Terminates the tagged transactions of this database, with the credentials they ran with."""
+        kwargs = {} if self.auth is None else {"auth": self.auth}
+        return self.backend.terminate_transactions(metadata, db=self.database, **kwargs)
+
+
+class Harvester:
+    """Extracts the schema and instances of many (url, database) targets concurrently.
+
+    One connector, and so one driver pool, is shared by all the databases of a server. When the
+    credentials depend on the database, as on the demo server, they are passed per session
+    (session-level auth, neo4j driver >= 5.8 and Neo4j >= 5.5). For older drivers or servers, set
+    share_driver=False to get one connector per server and credentials instead.
+    The Neo4jGraph connectors share their driver pool with the other wrappers through the driver registry.
+    At most max_workers databases are harvested at a time over all the servers.
+    A failing database is recorded in the errors of the store, the others are unaffected."""
+
+    def __init__(self,
+                 auth: Union[Auth, Callable[[str, str], Auth]],
+                 node_instances_size: int = 12,
+                 rels_instances_size: int = 12,
+                 max_workers: int = 8,
+                 connect: Optional[Callable[[str, str, str], Any]] = None,
+                 share_driver: bool = True,
+                 ) -> None:
+        """
+        Input:
+        - auth: (username, password) for all the targets, or a function of (url, database) such as demo_auth
+        - node_instances_size, rels_instances_size: instances extracted per label and per relationship
+        - max_workers: global limit of databases harvested concurrently
+        - connect: function of (url, username, password) returning a connector, Neo4jGraph by default,
+        its query method has to accept auth when share_driver is set and auth is a function
+        - share_driver: if one connector per url serves all the credentials, through session-level auth
+        """
+        self.auth = auth
+        self.node_instances_size = node_instances_size
+        self.rels_instances_size = rels_instances_size
+        self.max_workers = max_workers
+        self.connect = connect
+        self.share_driver = share_driver
+        self._connectors: Dict[Tuple, Any] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _credentials(self, url: str, database: str) -> Auth:
+        return self.auth(url, database) if callable(self.auth) else self.auth
+
+    def session_auth(self, url: str, database: str) -> Optional[Auth]:
+        """Credentials passed with every query of a target, when they differ between the targets of a shared connector."""
+        return self._credentials(url, database) if self.share_driver and callable(self.auth) else None
+
+    def connector(self, url: str, database: str) -> Any:
+        """Connector shared by the targets with the same url, and the same credentials unless share_driver is set.
+        A shared connector is created with the credentials of its first target."""
+        credentials = self._credentials(url, database)
+        key = (url,) if self.share_driver else (url, credentials)
+        # Connecting to a slow server only blocks the targets of that server
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            conn = self._connectors.get(key)
+            if conn is None:
+                if self.connect is not None:
+                    conn = self.connect(url, *credentials)
+                else:
+                    from utils.neo4j_conn import Neo4jGraph
+                    conn = Neo4jGraph(url, credentials[0], credentials[1], database)
+                with self._lock:
+                    self._connectors[key] = conn
+        return conn
+
+    def harvest_one(self, url: str, database: str) -> Dict[str, Any]:
+        """Schema and serialized instances of one database."""
+        from utils.neo4j_schema import Neo4jSchema
+
+        start = time.perf_counter()
+        backend = DatabaseBackend(self.connector(url, database), database, self.session_auth(url, database))
+        gutils = Neo4jSchema(conn=backend)
+        jschema = gutils.get_structured_schema
+        node_instances = gutils.extract_node_instances(get_nodes_list(jschema), self.node_instances_size)
+        rels_instances = gutils.extract_multiple_relationships_instances(jschema["relationships"],
+                                                                         self.rels_instances_size)
+        return {
+            "url": url,
+            "database": database,
+            "schema": gutils.get_schema,
+            "structured_schema": jschema,
+            "node_instances": serialize_nodes_data(node_instances),
+            "rels_instances": serialize_relationships_data(rels_instances),
+            "elapsed": time.perf_counter() - start,
+            }
+
+    def _safe_harvest(self, target: Target) -> Dict[str, Any]:
+        url, database = target
+        try:
+            return self.harvest_one(url, database)
+        except Exception as e:
+            return {"url": url, "database": database, "error": f"{type(e).__name__}: {e}"}
+
+    def harvest(self, targets: Iterable[Target]) -> Dict[str, Any]:
+        """Harvests the targets and returns the consolidated store:
+        {"version", "databases": [entries in the order of the targets], "errors": [{url, database, error}]}."""
+        targets = list(dict.fromkeys(targets))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._safe_harvest, targets))
+
+        return {
+            "version": STORE_VERSION,
+            "databases": [r for r in results if "error" not in r],
+            "errors": [r for r in results if "error" in r],
+            }
+
+    def close(self) -> None:
+        """Closes the shared connectors."""
+        with self._lock:
+            connectors = list(self._connectors.values())
+            self._connectors.clear()
+        for conn in connectors:
+            conn.close()
+
+    def __enter__(self) -> "Harvester":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+#### Store ####
+
+def write_store(store: Dict[str, Any], file_path: str) -> None:
+    """Writes a harvested store to a json file."""
+    with open(file_path, "w", encoding="utf-8") as fp:
+        json.dump(store, fp)
+
+
+def read_store(file_path: str) -> Dict[str, Any]:
+    """Reads a store written by write_store."""
+    with open(file_path, encoding="utf-8") as fp:
+        store = json.load(fp)
+    if store.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported store version in {file_path}.")
+    return store
+
+
+def store_index(store: Dict[str, Any]) -> Dict[Target, Dict[str, Any]]:
+    """Entries of a store by (url, database)."""
+    return {(entry["url"], entry["database"]): entry for entry in store["databases"]}
+
+
+def harvest_databases(targets: Iterable[Target],
+                      auth: Union[Auth, Callable[[str, str], Auth]],
+                      output_path: Optional[str] = None,
+                      **kwargs
+                      ) -> Dict[str, Any]:
+    """Harvests the targets with a Harvester and writes the store to output_path if given."""
+    with Harvester(auth, **kwargs) as harvester:
+        store = harvester.harvest(targets)
+    if output_path is not None:
+        write_store(store, output_path)
+    return store
@@ -0,0 +1,249 @@
+"""Opt-in profiling of the pipeline stages"""
+
+from typing import Any, List, Dict, Callable, Optional
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Checked by every instrumented call, nothing else runs while it is False
+_enabled = False
+
+# Trace events kept in memory, older events are dropped beyond this size
+MAX_EVENTS = 100_000
+
+
+class Profiler:
+    """Per-stage wall time, call counts, records, bytes and peak memory, with trace events.
+    The peak memory of a stage is the largest increase of the traced memory during one of its calls,
+    over the traced memory at the start of the call. tracemalloc has a single, process-wide peak:
+    it is reset when a call starts, and folded into the calls still open, so nested stages are measured too."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.trace_memory = False
+        self._frames: List[Dict[str, int]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats: Dict[str, Dict[str, float]] = {}
+            self.events: List[Dict[str, Any]] = []
+            self.origin = time.perf_counter()
+            self.peak_memory = 0
+
+    def _stage(self, name: str) -> Dict[str, float]:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = {"calls": 0, "seconds": 0.0, "records": 0, "bytes": 0,
+                                        "peak_memory": 0}
+        return stats
+
+    def memory_start(self) -> Optional[Dict[str, int]]:
+        """Starts measuring the peak memory of a call, None if the memory is not traced."""
+        tracemalloc = sys.modules.get("tracemalloc")
+        if not self.trace_memory or tracemalloc is None or not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self._fold(peak)
+            tracemalloc.reset_peak()
+            frame = {"base": current, "peak": current}
+            self._frames.append(frame)
+        return frame
+
+    def memory_stop(self, frame: Optional[Dict[str, int]]) -> int:
+        """Peak memory of a call over the memory at its start, 0 if the memory is not traced."""
+        tracemalloc = sys.modules.get("tracemalloc")
+        if frame is None or tracemalloc is None or not tracemalloc.is_tracing():
+            return 0
+        with self._lock:
+            self._fold(tracemalloc.get_traced_memory()[1])
+            self._frames.remove(frame)
+        return frame["peak"] - frame["base"]
+
+    def _fold(self, peak: int) -> None:
+        # The peak since the last reset counts for every open call and for the process
+        for frame in self._frames:
+            frame["peak"] = max(frame["peak"], peak)
+        self.peak_memory = max(self.peak_memory, peak)
+
+    def add(self,
+            name: str,
+            seconds: float = 0.0,
+            records: int = 0,
+            nbytes: int = 0,
+            calls: int = 1,
+            start: Optional[float] = None,
+            peak_memory: int = 0,
+            ) -> None:
+        """Adds a measurement to a stage, and a trace event if the start time is given."""
+        with self._lock:
+            stats = self._stage(name)
+            stats["calls"] += calls
+            stats["seconds"] += seconds
+            stats["records"] += records
+            stats["bytes"] += nbytes
+            stats["peak_memory"] = max(stats["peak_memory"], peak_memory)
+            if start is not None and len(self.events) < MAX_EVENTS:
+                self.events.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                    "ts": (start - self.origin) * 1e6, "dur": seconds * 1e6,
+                    "args": {"records": records, "bytes": nbytes},
+                    })
+
+    def report(self) -> Dict[str, Any]:
+        """Summary of all the stages, sorted by total wall time."""
+        with self._lock:
+            stages = sorted(self.stats.items(), key=lambda item: -item[1]["seconds"])
+            return {
+                "stages": {name: dict(stats) for name, stats in stages},
+                "peak_memory": None if traced_peak() is None else max(self.peak_memory, traced_peak()),
+                }
+
+
+PROFILER = Profiler()
+
+
+def traced_peak() -> Optional[int]:
+    """Peak memory traced by tracemalloc, None if it is not tracing.
+    tracemalloc is only imported by enable(trace_memory=True)."""
+    tracemalloc = sys.modules.get("tracemalloc")
+    if tracemalloc is None or not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[1]
+
+
+#### Switches ####
+
+def enable(trace_memory: bool = False) -> None:
+    """Turns the instrumentation on. With trace_memory, peak memory is tracked with tracemalloc,
+    which slows down allocations noticeably."""
+    global _enabled
+    PROFILER.trace_memory = trace_memory
+    if trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    """Turns the instrumentation off, the collected measurements are kept."""
+    global _enabled
+    _enabled = False
+    if PROFILER.trace_memory and traced_peak() is not None:
+        sys.modules["tracemalloc"].stop()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    PROFILER.reset()
+
+
+#### Instrumentation points ####
+
+def count_records(result: Any) -> int:
+    """Number of records in a result, the length for lists."""
+    return len(result) if isinstance(result, (list, tuple)) else 0
+
+
+def json_size(result: Any) -> int:
+    """Approximate number of bytes of a result, as json."""
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def instrumented(stage: Optional[str] = None,
+                 measure_bytes: bool = False,
+                 events: bool = True,
+                 ) -> Callable:
+    """Decorator recording the wall time, calls and records of a function under a stage name.
+    With measure_bytes, the json size of the result is recorded as well.
+    Set events to False for functions called per sample, to keep the trace small.
+    When the instrumentation is disabled, the only cost is one flag check."""
+
+    def decorator(fn: Callable) -> Callable:
+        name = stage or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            frame = PROFILER.memory_start()
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                PROFILER.memory_stop(frame)
+                raise
+            elapsed = time.perf_counter() - start
+            PROFILER.add(name, elapsed, count_records(result),
+                         json_size(result) if measure_bytes else 0,
+                         start=start if events else None,
+                         peak_memory=PROFILER.memory_stop(frame))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def traced(fn: Callable,
+           stage: str
+           ) -> Callable:
+    """Returns fn wrapped with instrumented(stage) when the instrumentation is enabled,
+    fn itself otherwise. Used for callbacks such as the prompters, without trace events."""
+    if not _enabled:
+        return fn
+    return instrumented(stage, events=False)(fn)
+
+
+def add_counts(stage: str,
+               records: int = 0,
+               nbytes: int = 0
+               ) -> None:
+    """Adds records or bytes to a stage without timing it."""
+    if _enabled:
+        PROFILER.add(stage, records=records, nbytes=nbytes, calls=0)
+
+
+@contextmanager
+def stage(name: str):
+    """Context manager timing a block of code as a stage."""
+    if not _enabled:
+        yield
+        return
+    frame = PROFILER.memory_start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILER.add(name, time.perf_counter() - start, start=start,
+                     peak_memory=PROFILER.memory_stop(frame))
+
+
+#### Reports ####
+
+def report() -> Dict[str, Any]:
+    return PROFILER.report()
+
+
+def write_report(file_path: str) -> None:
+    """Writes the per-stage summary to a json file."""
+    with open(file_path, "w") as fp:
+        json.dump(report(), fp, indent=2)
+
+
+def write_trace(file_path: str) -> None:
+    """Writes the trace events in the Chrome trace event format (chrome://tracing, Perfetto)."""
+    with open(file_path, "w") as fp:
+        json.dump({"traceEvents": PROFILER.events, "displayTimeUnit": "ms"}, fp)
@@ -1,72 +1,174 @@
 """Graph database connector and query parsers."""
 
-from typing import Any, Dict, List
-import pandas as pd
-
-import neo4j
-from neo4j.exceptions import CypherSyntaxError
-from neo4j import GraphDatabase
+from typing import Any, Dict, List, Optional, Tuple
 
 # Import local modules
-from utils.utilities import *
+from utils.preflight import PlanBudget, PlanCache, check_plan, root_estimated_rows, rewrite_with_limit
+from utils.backends import GraphBackend
+from utils.instrumentation import instrumented
+from utils.driver_registry import acquire_driver
+
+__all__ = ["Neo4jGraph"]
+
+
+def session_config(database: str,
+                   auth: Optional[Tuple[str, str]] = None
+                   ) -> Dict[str, Any]:
+    """Session arguments, auth is only passed when set so older drivers keep working."""
+    if auth is None:
+        return {"database": database}
+    return {"database": database, "auth": auth}
 
-class Neo4jGraph:
+
+class Neo4jGraph(GraphBackend):
     """Neo4j wrapper for graph operations."""
 
+    _handle = None
+
     def __init__(
         self, 
         url: str, 
         username: str, 
         password: str, 
         database: str,
+        budget: Optional[PlanBudget] = None,
+        max_connection_pool_size: Optional[int] = None,
+        fetch_size: Optional[int] = None,
         ) -> None:
         
-        """Create a new Neo4j graph wrapper instance."""
+        """Create a new Neo4j graph wrapper instance.
+        The driver is shared by all the wrappers of the same url and credentials, see utils.driver_registry.
+        It connects on the first query, connection errors are raised from there.
+        If a budget is given, every query is checked with EXPLAIN before it is executed."""
       
-        self._driver = neo4j.GraphDatabase.driver(url,
-                                                   auth=(username, password),
-                                                   )
+        self._handle = acquire_driver(url, username, password,
+                                      max_connection_pool_size, fetch_size)
         # Set the database name                                           
         self._database = database
         
         self.schema = ""
 
-        # Verify connection
-        try:
-            self._driver.verify_connectivity()
-        except neo4j.exceptions.ServiceUnavailable:
-            raise ValueError(
-                "Could not connect to Neo4j database. "
-                "Please ensure that the url is correct."
-            )
-        except neo4j.exceptions.AuthError:
-            raise ValueError(
-                "Could not connect to Neo4j database. "
-                "Please ensure that the username and password are correct"
-            )
-        
+        # Pre-flight settings
+        self.budget = budget
+        self._plan_cache = PlanCache()
 
     def close(self):
-        """Closes the Neo4j connection."""
-        if self._driver is not None:
-            self._driver.close()
+        """Releases the shared Neo4j connection, closed with its last wrapper."""
+        if self._handle is not None:
+            self._handle.close()
     
     
+    @instrumented("neo4j.query", measure_bytes=True)
     def query(self, 
               cypher_query: str, 
               params: dict = {},
-              db=None
+              db=None,
+              timeout: Optional[float] = None,
+              metadata: Optional[Dict[str, Any]] = None,
+              auth: Optional[Tuple[str, str]] = None,
               ) -> List[Dict[str, Any]]:
-        """Query Neo4j database. Outputs a list of dictionaries."""
+        """Query Neo4j database. Outputs a list of dictionaries.
+        The timeout (in seconds) and the metadata are attached to the transaction,
+        the server terminates the transaction when the timeout expires.
+        auth runs the session with other credentials than the driver (neo4j >= 5.8),
+        so databases with their own users can share one driver pool."""
+        import neo4j
+        from neo4j.exceptions import CypherSyntaxError
 
         target_db = self._database if db is None else db
 
-        with self._driver.session(database=target_db) as session:
+        if self.budget is not None:
+            cypher_query = self.preflight(cypher_query, params, db=target_db, auth=auth)
+
+        with self._handle.session(**session_config(target_db, auth)) as session:
             try:
-                data = session.run(cypher_query, params)
+                data = session.run(neo4j.Query(cypher_query, metadata=metadata, timeout=timeout),
+                                   params)
                 return [r.data() for r in data]
             except CypherSyntaxError as e:
                 raise ValueError(
-                    "Generated Cypher Statement is not valid\n" f"{e}") 
+                    "Generated Cypher Statement is not valid\n" f"{e}")
+
+    def terminate_transactions(self,
+                               metadata: Dict[str, Any],
+                               db=None,
+                               auth: Optional[Tuple[str, str]] = None,
+                               ) -> int:
+        """Terminates the running transactions tagged with the given metadata.
+        auth has to be the one the queries ran with, other users can not see or terminate them.
+        Returns the number of terminated transactions."""
+
+        target_db = self._database if db is None else db
+        conditions = " AND ".join(f"metaData.{key} = ${key}" for key in metadata)
+        with self._handle.session(**session_config(target_db, auth)) as session:
+            ids = [r["transactionId"] for r in session.run(
+                "SHOW TRANSACTIONS YIELD transactionId, metaData "
+                f"WHERE {conditions} RETURN transactionId", metadata)]
+            if ids:
+                session.run("TERMINATE TRANSACTIONS $ids", {"ids": ids}).consume()
+        return len(ids)
+
+    #### Pre-flight Utilities ####
+
+    @instrumented("neo4j.explain")
+    def explain(self,
+                cypher_query: str,
+                params: dict = {},
+                db=None,
+                auth: Optional[Tuple[str, str]] = None,
+                ) -> Dict[str, Any]:
+        """Returns the EXPLAIN plan of a query without executing it.
+        Plans are cached per normalized query."""
+        from neo4j.exceptions import CypherSyntaxError
+
+        target_db = self._database if db is None else db
+
+        plan = self._plan_cache.get(cypher_query, target_db)
+        if plan is not None:
+            return plan
+
+        with self._handle.session(**session_config(target_db, auth)) as session:
+            try:
+                summary = session.run(f"EXPLAIN {cypher_query}", params).consume()
+            except CypherSyntaxError as e:
+                raise ValueError(
+                    "Generated Cypher Statement is not valid\n" f"{e}")
+
+        plan = summary.plan or {}
+        self._plan_cache.put(cypher_query, plan, target_db)
+        return plan
+
+    def preflight(self,
+                  cypher_query: str,
+                  params: dict = {},
+                  budget: Optional[PlanBudget] = None,
+                  db=None,
+                  auth: Optional[Tuple[str, str]] = None,
+                  ) -> str:
+        """Checks a query plan against the cost budget.
+        Returns the query to execute, rewritten with a LIMIT if allowed by the budget,
+        or raises a ValueError listing the violations.
+        A LIMIT only bounds the returned rows, so the rewrite is only tried when the root operator
+        exceeds the rows budget, and the rewritten query is checked again with its own plan."""
+
+        budget = self.budget if budget is None else budget
+        if budget is None:
+            budget = PlanBudget()
+
+        plan = self.explain(cypher_query, params, db=db, auth=auth)
+        violations = check_plan(cypher_query, plan, budget)
+        if not violations:
+            return cypher_query
+
+        # Only a too large result can be fixed by limiting the rows
+        if budget.rewrite and all(v.startswith("Estimated rows") for v in violations) \
+                and root_estimated_rows(plan) > budget.max_estimated_rows:
+            rewritten = rewrite_with_limit(cypher_query, budget.max_estimated_rows)
+            if rewritten is not None:
+                rewritten_plan = self.explain(rewritten, params, db=db, auth=auth)
+                violations = check_plan(rewritten, rewritten_plan, budget)
+                if not violations:
+                    return rewritten
 
-    
\ No newline at end of file
+        raise ValueError(
+            "Generated Cypher Statement exceeds the cost budget\n" + "\n".join(violations))
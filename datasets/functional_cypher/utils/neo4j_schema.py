@@ -1,12 +1,14 @@
 
 """Functions to extract specific KG information and data using Cypher"""
 
-from typing import Any, List, Iterable
-import neo4j
+from typing import Any, List, Dict, Optional
 
 # Import local modules
-from utils.utilities import *
 from utils.neo4j_conn import Neo4jGraph
+from utils.backends import GraphBackend
+from utils.instrumentation import instrumented
+
+__all__ = ["Neo4jSchema", "node_properties_query", "rel_query", "rel_properties_query"]
 
 #### Queries ####
 
@@ -39,25 +41,49 @@ class Neo4jSchema(Neo4jGraph):
 
     def __init__(
         self, 
-        url: str, 
-        username: str, 
-        password: str, 
-        database: str,
+        url: str = "", 
+        username: str = "", 
+        password: str = "", 
+        database: str = "neo4j",
+        conn: Optional[GraphBackend] = None,
         ) -> None:
-        """Create a Neo4j graph wrapper instance and extract schema information."""
-
-        self.conn = Neo4jGraph(url, username, password, database)
+        """Create a Neo4j graph wrapper instance and extract schema information.
+        An existing backend, e.g. a RecordingBackend or a ReplayBackend, can be passed as conn,
+        otherwise the queries run on this wrapper, through the shared driver of the registry.
+        Queries made on the wrapper itself, e.g. schema.query(...), run on conn as well."""
+
+        if conn is None:
+            super().__init__(url, username, password, database)
+            conn = self
+        self.conn = conn
         self.schema: str = ""
         self.structured_schema: Dict[str, Any] = {}
 
+        try:
+            from neo4j.exceptions import ClientError
+        except ImportError:
+            # Recorded backends run without the driver
+            ClientError = ()
+
         try:
             self.build_schema()
-        except neo4j.exceptions.ClientError:
+        except ClientError:
             raise ValueError(
                 "Could not use APOC procedures. "
                 "Please ensure the APOC plugin is installed in Neo4j and that "
                 "'apoc.meta.data()' is allowed in Neo4j configuration "
             )
+
+    def query(self,
+              cypher_query: str,
+              params: dict = {},
+              db=None,
+              **kwargs
+              ) -> List[Dict[str, Any]]:
+        """Runs the query on conn, or on this wrapper's own connection when no conn was passed."""
+        if self.conn is self:
+            return super().query(cypher_query, params, db=db, **kwargs)
+        return self.conn.query(cypher_query, params, db=db, **kwargs)
     
     #### Schema Utilities ####
 
@@ -71,6 +97,7 @@ class Neo4jSchema(Neo4jGraph):
         """Returns the schema as a json object."""
         return self.structured_schema
 
+    @instrumented()
     def build_schema(self) -> None:
         """Build KG schema as a string or as a json object."""
 
@@ -121,6 +148,7 @@ class Neo4jSchema(Neo4jGraph):
 
     #### Instances Utilities ####
     
+    @instrumented()
     def extract_node_instances(self, 
                             selected_labels: List[str], 
                             n: int) -> List[Any]:
@@ -139,6 +167,7 @@ class Neo4jSchema(Neo4jGraph):
         return extracted
     
         
+    @instrumented()
     def extract_relationship_instances(self,
                                        rel: Dict,
                                        n: int,
@@ -156,6 +185,7 @@ class Neo4jSchema(Neo4jGraph):
         return data 
     
     
+    @instrumented()
     def extract_multiple_relationships_instances( self,
                             rtriples: List[Any], 
                             n: int,
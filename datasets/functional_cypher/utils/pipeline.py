@@ -0,0 +1,332 @@
+"""Content-addressed, resumable stages of the SFT functional data builder"""
+
+from typing import Any, List, Dict, Callable, Iterable, Optional, Set
+import hashlib
+import inspect
+import json
+import os
+import random
+import sys
+from itertools import product
+from collections import defaultdict
+
+# Import local modules
+from utils.utilities import (write_json, add_sample, build_label_sampler, build_node_sampler,
+                             get_property_pairs, build_nodes_property_pairs_sampler, build_nodes_pairs,
+                             build_relationships_samples, build_relationships_props_samples,
+                             collect_samples)
+from utils.graph_utils import (retrieve_datatypes, get_nodes_list, transform_temporals_in_dict,
+                               serialize_nodes_data, serialize_relationships_data,
+                               parse_node_instances_datatype, filter_relationships_instances,
+                               filter_relationships_with_props_instances,
+                               retrieve_instances_with_relationships_props, build_minimal_subschema)
+from utils.instrumentation import stage
+
+# Bump to invalidate every cached stage, e.g. after a change of the cache format
+PIPELINE_VERSION = 1
+
+SYSTEM_MESSAGE = "Convert the following question into a Cypher query using the provided graph schema!"
+
+
+#### Hashing ####
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of json-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:20]
+
+
+def code_version(*objects: Any) -> str:
+    """Hash of the source code of functions, classes or modules, unwrapping decorators."""
+    sources = []
+    for obj in objects:
+        try:
+            sources.append(inspect.getsource(inspect.unwrap(obj)))
+        except (OSError, TypeError):
+            sources.append(getattr(obj, "__qualname__", repr(obj)))
+    return fingerprint(PIPELINE_VERSION, sources)
+
+
+def file_digest(path: str) -> str:
+    """Hash of the content of a file, e.g. a recording used as the data source."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+#### Stage cache ####
+
+class StageCache:
+    """Stores the output of every stage as json under <cache_dir>/<stage>/<key>.json.
+    The key of a stage hashes its parameters, its code version and the digests of its inputs,
+    the digest of an output hashes its content. A stage whose inputs did not change is read back,
+    and a stage recomputed to the same content leaves the downstream keys unchanged.
+    Files are written atomically, so an interrupted run resumes from the last completed stage."""
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        self.log: List[Dict[str, Any]] = []
+
+    def path(self, stage_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage_name, f"{key}.json")
+
+    def run(self,
+            stage_name: str,
+            key: str,
+            compute: Callable[[], Any],
+            refresh: bool = False,
+            ) -> Dict[str, Any]:
+        """Returns {"value", "digest", "cached"} for a stage, computing it on a cache miss or with refresh."""
+        path = self.path(stage_name, key)
+        cached = not refresh and os.path.exists(path)
+        if cached:
+            with open(path, "rb") as fp:
+                payload = fp.read()
+            value = json.loads(payload)
+        else:
+            with stage(f"pipeline.{stage_name}"):
+                value = compute()
+            payload = json.dumps(value).encode("utf-8")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(payload)
+            os.replace(tmp_path, path)
+
+        digest = hashlib.sha256(payload).hexdigest()[:20]
+        self.log.append({"stage": stage_name, "key": key, "cached": cached})
+        return {"value": value, "digest": digest, "cached": cached}
+
+
+#### Stages ####
+
+def extract_schema(gutils: Any) -> Dict[str, Any]:
+    """Structured schema of the graph."""
+    return gutils.get_structured_schema
+
+
+def extract_instances(gutils: Any,
+                      jschema: Dict,
+                      node_instances_size: int,
+                      rels_instances_size: int,
+                      ) -> Dict[str, Any]:
+    """Node and relationship instances, serialized for json."""
+    node_instances = gutils.extract_node_instances(get_nodes_list(jschema), node_instances_size)
+    rels_instances = gutils.extract_multiple_relationships_instances(jschema["relationships"],
+                                                                     rels_instances_size)
+    return {"nodes": serialize_nodes_data(node_instances),
+            "relationships": serialize_relationships_data(rels_instances)}
+
+
+def parse_buckets(jschema: Dict,
+                  instances: Dict[str, Any],
+                  ) -> Dict[str, Any]:
+    """Parses the instances into the buckets of the data builder:
+    dparsed (node properties by datatype), drels (relationships by end node datatypes)
+    and drelsprops (relationships with properties by datatypes)."""
+
+    nodes = get_nodes_list(jschema)
+    node_instances = instances["nodes"]
+    rels_instances = instances["relationships"]
+    node_dtypes = retrieve_datatypes(jschema, "node")
+    rel_dtypes = retrieve_datatypes(jschema, "rel")
+
+    dparsed = {f"{datatype.lower()}_parsed": parse_node_instances_datatype(jschema, node_instances,
+                                                                            nodes, datatype, True)
+               for datatype in node_dtypes}
+    dparsed["dtypes_parsed"] = sum(dparsed.values(), [])
+
+    dtypes_pairs = list(product(node_dtypes, repeat=2))
+    drels = {f"{dt1.lower()}_{dt2.lower()}_rels": filter_relationships_instances(jschema, rels_instances, dt1, dt2)
+             for dt1, dt2 in dtypes_pairs}
+    drels["all_rels"] = sum(drels.values(), [])
+    drels = {key: value for key, value in drels.items() if value}
+
+    instances_with_rel_props = retrieve_instances_with_relationships_props(rels_instances)
+    drelsprops = {}
+    for dt1, dt2 in dtypes_pairs:
+        for rt in rel_dtypes:
+            filtered = filter_relationships_with_props_instances(jschema, instances_with_rel_props, dt1, rt, dt2)
+            if filtered:
+                drelsprops[f"{dt1.lower()}_{rt.lower()}_{dt2.lower()}_rels"] = filtered
+    drelsprops["all_rels"] = sum(drelsprops.values(), [])
+
+    return {"dparsed": dparsed, "drels": drels, "drelsprops": drelsprops}
+
+
+class FamilyContext:
+    """Everything a prompter family reads: the schema, the parsed buckets and the options.
+    Families receive it as their only argument, in place of the notebook globals,
+    and pass ctx.options to the sample builders. A bucket missing from the graph,
+    e.g. date_parsed without date properties, reads as empty so its families build no samples."""
+
+    def __init__(self,
+                 jschema: Dict,
+                 buckets: Dict[str, Any],
+                 system_message: str = SYSTEM_MESSAGE,
+                 allow_repeats: bool = True,
+                 record_dependencies: bool = False,
+                 only_dependencies: Optional[Set[str]] = None,
+                 ) -> None:
+        self.jschema = jschema
+        self.nodes = get_nodes_list(jschema)
+        self.relationships = jschema["relationships"]
+        self.dparsed = defaultdict(list, buckets["dparsed"])
+        self.drels = defaultdict(list, buckets["drels"])
+        self.drelsprops = defaultdict(list, buckets["drelsprops"])
+        self.system_message = system_message
+        self.allow_repeats = allow_repeats
+        self.record_dependencies = record_dependencies
+        self.only_dependencies = only_dependencies
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """Keyword arguments of the sample builders."""
+        return {"allow_repeats": self.allow_repeats,
+                "record_dependencies": self.record_dependencies,
+                "only_dependencies": self.only_dependencies}
+
+
+def run_family(family: Callable[[FamilyContext], List[Dict]],
+               ctx: FamilyContext,
+               sample_max: int,
+               seed: int = 0,
+               ) -> List[Dict]:
+    """Builds the samples of one family and keeps at most sample_max of them.
+    The random generator is seeded per family, so the result does not depend on the other families.
+    With ctx.record_dependencies, the samples also store the family name, under the Family key."""
+    random.seed(fingerprint(seed, family.__name__))
+    samples = collect_samples(family(ctx), sample_max)
+    if ctx.record_dependencies:
+        for sample in samples:
+            sample["Family"] = family.__name__
+    return samples
+
+
+#### Pipeline ####
+
+# Code each stage depends on, beside the stage function itself
+INSTANCES_CODE = (transform_temporals_in_dict, serialize_nodes_data, serialize_relationships_data)
+BUCKETS_CODE = (retrieve_datatypes, get_nodes_list, parse_node_instances_datatype,
+                filter_relationships_instances, filter_relationships_with_props_instances,
+                retrieve_instances_with_relationships_props)
+FAMILY_CODE = (FamilyContext, run_family, add_sample, build_label_sampler, build_node_sampler, get_property_pairs,
+               build_nodes_property_pairs_sampler, build_nodes_pairs, build_relationships_samples,
+               build_relationships_props_samples, collect_samples, build_minimal_subschema)
+
+
+def load_families(module_name: str,
+                  only: Optional[Iterable[str]] = None,
+                  ) -> List[Callable]:
+    """Imports a module exposing FAMILIES, a list of functions taking a FamilyContext
+    and returning a list of samples. With only, keeps the families of these names."""
+    import importlib
+
+    families = list(importlib.import_module(module_name).FAMILIES)
+    if only:
+        only = set(only)
+        unknown = only - {f.__name__ for f in families}
+        if unknown:
+            raise ValueError(f"Unknown families: {sorted(unknown)}.")
+        families = [f for f in families if f.__name__ in only]
+    return families
+
+
+def prepare_stages(cache: StageCache,
+                   source_id: str,
+                   schema_factory: Callable[[], Any],
+                   node_instances_size: int = 12,
+                   rels_instances_size: int = 12,
+                   refresh: bool = False,
+                   ) -> Dict[str, Dict[str, Any]]:
+    """Runs the schema, instances and buckets stages, the inputs of the families.
+    Returns the cache results of the schema and of the buckets."""
+    gutils = None
+
+    def schema_utils():
+        nonlocal gutils
+        if gutils is None:
+            gutils = schema_factory()
+        return gutils
+
+    schema = cache.run("schema", fingerprint(source_id, code_version(extract_schema)),
+                       lambda: extract_schema(schema_utils()), refresh)
+    jschema = schema["value"]
+
+    instances = cache.run("instances",
+                          fingerprint(source_id, schema["digest"], node_instances_size, rels_instances_size,
+                                      code_version(extract_instances, *INSTANCES_CODE)),
+                          lambda: extract_instances(schema_utils(), jschema,
+                                                    node_instances_size, rels_instances_size),
+                          refresh)
+
+    buckets = cache.run("buckets",
+                        fingerprint(schema["digest"], instances["digest"],
+                                    code_version(parse_buckets, *BUCKETS_CODE)),
+                        lambda: parse_buckets(jschema, instances["value"]))
+
+    return {"schema": schema, "buckets": buckets}
+
+
+def run_pipeline(source_id: str,
+                 schema_factory: Callable[[], Any],
+                 families: List[Callable],
+                 output_path: str,
+                 cache_dir: str,
+                 node_instances_size: int = 12,
+                 rels_instances_size: int = 12,
+                 allow_repeats: bool = True,
+                 sample_max: int = 500,
+                 system_message: str = SYSTEM_MESSAGE,
+                 seed: int = 0,
+                 refresh: bool = False,
+                 record_dependencies: bool = False,
+                 schema_path: Optional[str] = None,
+                 ) -> Dict[str, Any]:
+    """
+    Runs schema -> instances -> buckets -> families -> write, reusing every cached stage.
+
+    Input:
+    - source_id: identifies the data source, e.g. the url and database, or the digest of a recording
+    - schema_factory: returns a Neo4jSchema, only called if the schema or the instances are extracted
+    - families: prompter families, see load_families
+    - output_path: json file of the samples, as written by write_json
+    - cache_dir: directory of the stage cache
+    - refresh: extracts the schema and the instances again, e.g. after the database changed
+    - record_dependencies: stores the schema elements of each sample, needed by utils.schema_diff
+    - schema_path: if given, the structured schema is also written there, the snapshot a later
+    regeneration is diffed against
+
+    Output:
+    - summary with the number of samples per family and the cached/computed stages
+    """
+    cache = StageCache(cache_dir)
+    stages = prepare_stages(cache, source_id, schema_factory, node_instances_size, rels_instances_size, refresh)
+    schema, buckets = stages["schema"], stages["buckets"]
+
+    ctx = FamilyContext(schema["value"], buckets["value"], system_message, allow_repeats, record_dependencies)
+    shared_code = code_version(*FAMILY_CODE)
+    trainer, counts = [], {}
+    for family in families:
+        result = cache.run(f"families/{family.__name__}",
+                           fingerprint(schema["digest"], buckets["digest"], shared_code, code_version(family),
+                                       allow_repeats, sample_max, system_message, seed, record_dependencies),
+                           lambda: run_family(family, ctx, sample_max, seed))
+        trainer += result["value"]
+        counts[family.__name__] = len(result["value"])
+
+    with stage("pipeline.write"):
+        write_json(trainer, output_path)
+        if schema_path is not None:
+            write_json(schema["value"], schema_path)
+
+    return {"samples": len(trainer), "families": counts, "stages": cache.log}
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    for entry in summary["stages"]:
+        status = "cached" if entry["cached"] else "computed"
+        print(f"{entry['stage']:<60} {status}", file=sys.stderr)
+    print(f"There are {summary['samples']} samples in the fine-tuning dataset.", file=sys.stderr)
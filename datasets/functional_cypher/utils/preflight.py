@@ -0,0 +1,171 @@
+"""Pre-flight inspection of Cypher queries using EXPLAIN plans"""
+
+from typing import List, Dict, Optional
+import re
+from collections import OrderedDict
+
+#### Cost budgets ####
+
+# Operators that usually signal a runaway generated query
+DEFAULT_FORBIDDEN_OPERATORS = ["CartesianProduct", "AllNodesScan"]
+
+# Variable-length patterns without an upper bound: [*], [r*], [:T*2..], [*..]
+UNBOUNDED_VARLENGTH = re.compile(r"\[[^\[\]]*\*\s*(\d+\s*\.\.\s*|\.\.\s*)?\]")
+
+LIMIT_CLAUSE = re.compile(r"\bLIMIT\s+\S+\s*$", re.IGNORECASE)
+
+# String literals, quoted identifiers and comments of a query, in the order they can start
+CYPHER_TOKEN = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|//[^\n]*|/\*.*?\*/""", re.DOTALL)
+
+
+class PlanBudget:
+    """Cost budgets a query plan has to satisfy before it is executed."""
+
+    def __init__(
+        self,
+        max_estimated_rows: float = 1e6,
+        forbidden_operators: Optional[List[str]] = None,
+        allow_unbounded_varlength: bool = False,
+        rewrite: bool = False,
+        ) -> None:
+        """
+        Input:
+        - max_estimated_rows: the upper limit for the estimated rows of any plan operator
+        - forbidden_operators: operator types that lead to rejection
+        - allow_unbounded_varlength: if variable-length patterns without an upper bound are accepted
+        - rewrite: if a query that only exceeds the rows budget is rewritten with a LIMIT instead of rejected
+        """
+        self.max_estimated_rows = max_estimated_rows
+        self.forbidden_operators = DEFAULT_FORBIDDEN_OPERATORS if forbidden_operators is None \
+            else forbidden_operators
+        self.allow_unbounded_varlength = allow_unbounded_varlength
+        self.rewrite = rewrite
+
+
+#### Plan parsing ####
+
+def normalize_query(cypher_query: str) -> str:
+    """Normalizes a query for caching: collapses whitespace and strips trailing semicolons."""
+    query = " ".join(cypher_query.split())
+    return query.rstrip(";").strip()
+
+
+def strip_comments(cypher_query: str) -> str:
+    """Removes the // and /* */ comments of a query, leaving string literals and quoted identifiers as is."""
+    parts = []
+    position = 0
+    for match in CYPHER_TOKEN.finditer(cypher_query):
+        parts.append(cypher_query[position:match.start()])
+        token = match.group()
+        parts.append(" " if token.startswith(("//", "/*")) else token)
+        position = match.end()
+    parts.append(cypher_query[position:])
+    return "".join(parts)
+
+
+def operator_name(plan: Dict) -> str:
+    """Returns the operator type of a plan node without the runtime suffix, e.g. 'Expand(All)@neo4j'."""
+    return plan.get("operatorType", "").split("@")[0]
+
+
+def plan_arguments(plan: Dict) -> Dict:
+    """Returns the arguments of a plan node. The summary plan of the Neo4j 5 driver is the Bolt plan,
+    which holds them under 'args' (see benchmarks/fixtures/explain_plan.json), older Plan objects
+    under 'arguments'."""
+    arguments = plan.get("args")
+    return plan.get("arguments", {}) if arguments is None else arguments
+
+
+def flatten_plan(plan: Dict) -> List[Dict]:
+    """Flattens the EXPLAIN plan tree into a list of operators: name, estimated rows and details."""
+    operators = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        arguments = plan_arguments(node)
+        operators.append({
+            "operator": operator_name(node),
+            "estimated_rows": float(arguments.get("EstimatedRows", 0.0)),
+            "details": arguments.get("Details", ""),
+            })
+        stack.extend(node.get("children", []))
+    return operators
+
+
+def root_estimated_rows(plan: Dict) -> float:
+    """Estimated rows of the root operator (ProduceResults), the rows returned by the query."""
+    return float(plan_arguments(plan).get("EstimatedRows", 0.0))
+
+
+def check_plan(cypher_query: str,
+               plan: Dict,
+               budget: PlanBudget
+               ) -> List[str]:
+    """Returns the list of budget violations found in the query and its plan.
+    An empty list means the query can be executed."""
+
+    violations = []
+    operators = flatten_plan(plan)
+
+    for op in operators:
+        # VarLengthExpand(All) -> VarLengthExpand
+        base = op["operator"].split("(")[0]
+        if base in budget.forbidden_operators or op["operator"] in budget.forbidden_operators:
+            violations.append(f"Forbidden operator {op['operator']}")
+
+    max_rows = max([op["estimated_rows"] for op in operators], default=0.0)
+    if max_rows > budget.max_estimated_rows:
+        violations.append(
+            f"Estimated rows {max_rows:.0f} exceed the budget of {budget.max_estimated_rows:.0f}")
+
+    if not budget.allow_unbounded_varlength and UNBOUNDED_VARLENGTH.search(cypher_query):
+        violations.append("Unbounded variable-length pattern")
+
+    return violations
+
+
+def rewrite_with_limit(cypher_query: str,
+                       limit: int
+                       ) -> Optional[str]:
+    """Appends a LIMIT to a read query that ends with RETURN and has no LIMIT.
+    The comments are removed first, so a trailing // comment can not swallow the LIMIT.
+    Returns None if the query can not be safely rewritten."""
+    query = strip_comments(cypher_query).strip().rstrip(";").rstrip()
+    if LIMIT_CLAUSE.search(query):
+        return None
+    if not re.search(r"\bRETURN\b", query, re.IGNORECASE) or re.search(r"\bUNION\b", query, re.IGNORECASE):
+        return None
+    return f"{query} LIMIT {int(limit)}"
+
+
+#### Plan cache ####
+
+class PlanCache:
+    """LRU cache of plans keyed by the target database and the normalized query."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        # (db, normalized query) -> plan
+        self._plans: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cypher_query: str, db: str = "") -> Optional[Dict]:
+        key = (db, normalize_query(cypher_query))
+        plan = self._plans.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._plans.move_to_end(key)
+        return plan
+
+    def put(self, cypher_query: str, plan: Dict, db: str = "") -> None:
+        key = (db, normalize_query(cypher_query))
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        if len(self._plans) > self.maxsize:
+            self._plans.popitem(last=False)
+
+    def clear(self) -> None:
+        self._plans.clear()
@@ -0,0 +1,288 @@
+"""Bounded-concurrency query scheduler with deadlines and cancellation"""
+
+from typing import Any, List, Dict, Optional, Union, Tuple
+import itertools
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, wait
+
+# Statuses reported for every scheduled query
+OK = "ok"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+ERROR = "error"
+
+# Extra time given to the server to report a transaction timeout
+# before the scheduler gives up waiting on it
+GRACE_PERIOD = 2.0
+
+
+class QueryResult:
+    """Outcome of a scheduled query."""
+
+    def __init__(self,
+                 job_id: int,
+                 query: str,
+                 status: str,
+                 data: Optional[List[Dict[str, Any]]] = None,
+                 elapsed: float = 0.0,
+                 error: str = "",
+                 ) -> None:
+        self.job_id = job_id
+        self.query = query
+        self.status = status
+        self.data = data
+        self.elapsed = elapsed
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"job_id": self.job_id, "query": self.query, "status": self.status,
+                "data": self.data, "elapsed": self.elapsed, "error": self.error}
+
+    def __repr__(self) -> str:
+        return f"QueryResult(job_id={self.job_id}, status={self.status}, elapsed={self.elapsed:.3f})"
+
+
+class _Job:
+    """A query waiting in or taken from the priority queue."""
+
+    def __init__(self, job_id, query, params, timeout, deadline):
+        self.job_id = job_id
+        self.query = query
+        self.params = params
+        self.timeout = timeout
+        self.deadline = deadline
+        self.future: Future = Future()
+        self.started: Optional[float] = None
+        self.cancelled = False
+
+
+class JobHandle:
+    """Handle on a scheduled query, returned by QueryScheduler.submit."""
+
+    def __init__(self, scheduler: "QueryScheduler", job_id: int, future: Future) -> None:
+        self.scheduler = scheduler
+        self.job_id = job_id
+        self.future = future
+
+    def result(self, timeout: Optional[float] = None) -> QueryResult:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self, status: str = CANCELLED) -> bool:
+        return self.scheduler.cancel(self.job_id, status)
+
+    def __repr__(self) -> str:
+        return f"JobHandle(job_id={self.job_id}, done={self.done()})"
+
+
+def is_timeout_error(e: Exception) -> bool:
+    """Checks if a driver error is a transaction timeout."""
+    return "TransactionTimedOut" in str(getattr(e, "code", "") or "")
+
+
+class QueryScheduler:
+    """Runs queries on a graph connector with a concurrency cap, a priority queue,
+    per-query and per-batch deadlines, and cancellation.
+
+    The connector needs a query(cypher_query, params, timeout=..., metadata=...) method,
+    and optionally terminate_transactions(metadata) to cancel in-flight work.
+    Transactions are tagged with the job id and a random id of the scheduler, so a cancellation
+    never terminates the jobs of another scheduler or process sharing the database."""
+
+    def __init__(self,
+                 graph: Any,
+                 max_concurrency: int = 4,
+                 default_timeout: Optional[float] = None,
+                 ) -> None:
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.scheduler_id = uuid.uuid4().hex
+
+        self._queue: "queue.PriorityQueue[Tuple[int, int, Optional[_Job]]]" = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._jobs: Dict[int, _Job] = {}
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+    #### Submission ####
+
+    def submit(self,
+               cypher_query: str,
+               params: dict = {},
+               priority: int = 0,
+               timeout: Optional[float] = None,
+               deadline: Optional[float] = None,
+               ) -> JobHandle:
+        """Schedules a query. Lower priority values run first.
+        - timeout: maximum execution time in seconds, enforced as the transaction timeout
+        - deadline: absolute time.monotonic() value after which the query is not started
+        The returned handle resolves to a QueryResult."""
+
+        if self._closed:
+            raise ValueError("The scheduler has been shut down.")
+
+        job_id = next(self._counter)
+        timeout = self.default_timeout if timeout is None else timeout
+        job = _Job(job_id, cypher_query, params, timeout, deadline)
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._start_workers()
+        self._queue.put((priority, job_id, job))
+        return JobHandle(self, job_id, job.future)
+
+    def run_batch(self,
+                  queries: List[Union[str, Tuple[str, dict]]],
+                  batch_timeout: Optional[float] = None,
+                  timeout: Optional[float] = None,
+                  priority: int = 0,
+                  ) -> List[QueryResult]:
+        """Runs a list of queries, given as strings or (query, params) pairs,
+        and returns their results in the same order.
+        Queries that are not done when the batch deadline expires are cancelled
+        and reported as timeouts with their elapsed time."""
+
+        deadline = None if batch_timeout is None else time.monotonic() + batch_timeout
+
+        handles = []
+        for entry in queries:
+            cypher_query, params = (entry, {}) if isinstance(entry, str) else entry
+            handles.append(self.submit(cypher_query, params, priority, timeout, deadline))
+
+        wait([h.future for h in handles], timeout=batch_timeout)
+
+        pending = [h for h in handles if not h.done()]
+        for h in pending:
+            h.cancel(status=TIMEOUT)
+        if pending:
+            wait([h.future for h in pending], timeout=GRACE_PERIOD)
+
+        return [h.result() for h in handles]
+
+    #### Cancellation ####
+
+    def cancel(self,
+               job_id: int,
+               status: str = CANCELLED
+               ) -> bool:
+        """Cancels a queued or running query. Returns False if it had already finished."""
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.future.done():
+            return False
+
+        with self._lock:
+            job.cancelled = True
+            started = job.started
+
+        if started is None:
+            # Still queued, the worker skips it
+            self._finish(job, QueryResult(job_id, job.query, status))
+            return True
+
+        # In-flight, ask the server to stop the transaction
+        terminate = getattr(self.graph, "terminate_transactions", None)
+        if terminate is not None:
+            try:
+                terminate(self._metadata(job_id))
+            except Exception:
+                pass
+
+        # Report the query now, even if the server is slow to terminate it
+        elapsed = time.monotonic() - started
+        self._finish(job, QueryResult(job_id, job.query, status, elapsed=elapsed))
+        return True
+
+    def cancel_all(self) -> int:
+        """Cancels all the queued and running queries."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def shutdown(self,
+                 wait: bool = True,
+                 cancel: bool = False
+                 ) -> None:
+        """Stops the workers once the queue is drained, optionally cancelling all the pending work."""
+        self._closed = True
+        if cancel:
+            self.cancel_all()
+        for _ in self._workers:
+            # Sentinels sort after every real job
+            self._queue.put((float("inf"), next(self._counter), None))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    #### Workers ####
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.max_concurrency:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: _Job) -> None:
+        if job.future.done():
+            return
+
+        timeout = job.timeout
+        if job.deadline is not None:
+            remaining = job.deadline - time.monotonic()
+            if remaining <= 0:
+                self._finish(job, QueryResult(job.job_id, job.query, TIMEOUT,
+                                              error="Batch deadline expired before the query started"))
+                return
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        with self._lock:
+            if job.cancelled:
+                return
+            job.started = time.monotonic()
+        try:
+            data = self.graph.query(job.query, job.params,
+                                    timeout=timeout,
+                                    metadata=self._metadata(job.job_id))
+            result = QueryResult(job.job_id, job.query, OK, data=data)
+        except Exception as e:
+            if job.cancelled:
+                status = CANCELLED
+            elif is_timeout_error(e):
+                status = TIMEOUT
+            else:
+                status = ERROR
+            result = QueryResult(job.job_id, job.query, status, error=str(e))
+        result.elapsed = time.monotonic() - job.started
+        self._finish(job, result)
+
+    def _metadata(self, job_id: int) -> Dict[str, Any]:
+        """Transaction metadata identifying a job across the server."""
+        return {"scheduler_id": self.scheduler_id, "scheduler_job": job_id}
+
+    def _finish(self, job: _Job, result: QueryResult) -> None:
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+            if job.future.done():
+                return
+            job.future.set_result(result)
@@ -0,0 +1,225 @@
+"""Regeneration of the samples affected by a change of the graph schema"""
+
+from typing import Any, List, Dict, Callable, Iterable, Optional, Set
+import json
+import os
+
+# Import local modules
+from utils.utilities import write_json
+from utils.schema_retrieval import normalize_structured_schema
+from utils.dedup import read_shard, shard_names
+from utils.pipeline import (SYSTEM_MESSAGE, StageCache, FamilyContext, fingerprint, prepare_stages, run_family)
+from utils.instrumentation import stage
+
+
+#### Schema diff ####
+
+def schema_signatures(jschema: Any) -> Dict[str, Any]:
+    """
+    Maps the id of every schema element to what a sample built on it relies on.
+
+    Input:
+    - jschema: structured schema, as a dictionary or as a json or Python literal string
+
+    Output:
+    - {'node:Label': True, 'node_prop:Label.prop': datatype,
+    'rel:TYPE': [[start, end], ...], 'rel_prop:TYPE.prop': datatype},
+    the ids recorded in the Dependencies of the samples
+    """
+    jschema = normalize_structured_schema(jschema)
+    signatures = {}
+
+    for label, props in jschema["node_props"].items():
+        signatures[f"node:{label}"] = True
+        for p in props:
+            signatures[f"node_prop:{label}.{p['property']}"] = p["datatype"]
+
+    endpoints = {}
+    for rel in jschema["relationships"]:
+        signatures.setdefault(f"node:{rel['start']}", True)
+        signatures.setdefault(f"node:{rel['end']}", True)
+        endpoints.setdefault(rel["type"], set()).add((rel["start"], rel["end"]))
+    for rtype, pairs in endpoints.items():
+        signatures[f"rel:{rtype}"] = [list(pair) for pair in sorted(pairs)]
+
+    for rtype, props in jschema["rel_props"].items():
+        signatures.setdefault(f"rel:{rtype}", [])
+        for p in props:
+            signatures[f"rel_prop:{rtype}.{p['property']}"] = p["datatype"]
+
+    return signatures
+
+
+def diff_structured_schemas(old: Any, new: Any) -> Dict[str, List[str]]:
+    """Ids of the schema elements added, removed or changed (datatype, relationship end points)
+    between two snapshots of a structured schema."""
+    old_signatures = schema_signatures(old)
+    new_signatures = schema_signatures(new)
+    return {
+        "added": sorted(new_signatures.keys() - old_signatures.keys()),
+        "removed": sorted(old_signatures.keys() - new_signatures.keys()),
+        "changed": sorted(k for k in old_signatures.keys() & new_signatures.keys()
+                          if old_signatures[k] != new_signatures[k]),
+        }
+
+
+def stale_dependencies(diff: Dict[str, List[str]]) -> Set[str]:
+    """Elements whose samples are dropped: the removed and the changed ones."""
+    return set(diff["removed"]) | set(diff["changed"])
+
+
+def rebuild_dependencies(diff: Dict[str, List[str]]) -> Set[str]:
+    """Elements whose samples are built again: the added and the changed ones."""
+    return set(diff["added"]) | set(diff["changed"])
+
+
+#### Shards ####
+
+def is_stale(sample: Dict, stale: Set[str]) -> bool:
+    """If a sample depends on a removed or changed schema element.
+    Samples without Dependencies, built before they were recorded, are never stale."""
+    dependencies = sample.get("Dependencies")
+    return dependencies is not None and not stale.isdisjoint(dependencies)
+
+
+def kept_per_family(input_paths: List[str],
+                    stale: Set[str],
+                    ) -> Dict[str, int]:
+    """Number of samples of each family that are not stale, by the Family key of the samples."""
+    kept = {}
+    for path in input_paths:
+        for sample in read_shard(path):
+            if "Family" in sample and not is_stale(sample, stale):
+                kept[sample["Family"]] = kept.get(sample["Family"], 0) + 1
+    return kept
+
+
+def write_shard(samples: List[Dict], path: str) -> None:
+    """Writes the samples in the format read by read_shard, chosen by the file extension."""
+    with open(path, "w", encoding="utf-8") as fp:
+        if path.endswith(".jsonl"):
+            for sample in samples:
+                fp.write(json.dumps(sample) + "\n")
+        else:
+            json.dump(samples, fp)
+
+
+def splice_shards(input_paths: List[str],
+                  output_dir: str,
+                  stale: Set[str],
+                  new_samples: Iterable[Dict],
+                  ) -> Dict[str, Any]:
+    """
+    Replaces the samples depending on a stale schema element by the new samples.
+
+    The new samples take the positions of the dropped ones, in shard order, so the other
+    samples keep their shard and their position. Extra new samples are appended to the last shard,
+    positions left over when there are fewer new samples are removed.
+    Samples without Dependencies, built before they were recorded, are kept and counted as untracked.
+
+    Input:
+    - input_paths: shards as json lists, as written by write_json, or json lines
+    - output_dir: directory of the spliced shards, written under their shard_names
+    - stale: ids of the removed and changed schema elements, see stale_dependencies
+    - new_samples: samples built for the added and changed schema elements
+
+    Output:
+    - report with the number of kept (untracked included), dropped, added and untracked samples per shard
+    """
+    if not input_paths:
+        raise ValueError("No shards to splice.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    pending = iter(new_samples)
+    report = {}
+
+    for n, (path, name) in enumerate(zip(input_paths, shard_names(input_paths))):
+        counts = {"kept": 0, "dropped": 0, "added": 0, "untracked": 0}
+        samples = []
+        for sample in read_shard(path):
+            if "Dependencies" not in sample:
+                counts["untracked"] += 1
+            elif is_stale(sample, stale):
+                counts["dropped"] += 1
+                replacement = next(pending, None)
+                if replacement is not None:
+                    samples.append(replacement)
+                    counts["added"] += 1
+                continue
+            samples.append(sample)
+            counts["kept"] += 1
+
+        if n == len(input_paths) - 1:
+            extra = list(pending)
+            samples += extra
+            counts["added"] += len(extra)
+
+        out_path = os.path.join(output_dir, name)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        write_shard(samples, out_path)
+        report[name] = counts
+
+    return report
+
+
+#### Regeneration ####
+
+def regenerate(source_id: str,
+               schema_factory: Callable[[], Any],
+               families: List[Callable],
+               old_schema: Any,
+               input_paths: List[str],
+               output_dir: str,
+               cache_dir: str,
+               node_instances_size: int = 12,
+               rels_instances_size: int = 12,
+               allow_repeats: bool = True,
+               sample_max: int = 500,
+               system_message: str = SYSTEM_MESSAGE,
+               seed: int = 0,
+               refresh: bool = False,
+               schema_path: Optional[str] = None,
+               ) -> Dict[str, Any]:
+    """
+    Rebuilds only the samples affected by the schema changes since old_schema and splices them
+    into the shards of a dataset built with record_dependencies, see run_pipeline.
+
+    Input:
+    - old_schema: structured schema the shards were built from, e.g. the schema_path of run_pipeline
+    - input_paths, output_dir: see splice_shards
+    - refresh: extracts the schema and the instances again, usually needed since the database changed
+    - schema_path: if given, the new structured schema is written there, for the next regeneration
+    - the other inputs are those of run_pipeline, and should match the ones of the original build
+
+    A family keeps at most sample_max samples: its rebuilt samples fill the room left by its kept ones,
+    so a family already at sample_max only gets new samples in place of dropped ones.
+
+    Output:
+    - report with the schema diff, the number of rebuilt samples per family and the splice counts
+    """
+    cache = StageCache(cache_dir)
+    stages = prepare_stages(cache, source_id, schema_factory, node_instances_size, rels_instances_size, refresh)
+    jschema = stages["schema"]["value"]
+
+    diff = diff_structured_schemas(old_schema, jschema)
+    stale = stale_dependencies(diff)
+    rebuild = rebuild_dependencies(diff)
+
+    new_samples, counts = [], {}
+    if rebuild:
+        kept = kept_per_family(input_paths, stale)
+        ctx = FamilyContext(jschema, stages["buckets"]["value"], system_message, allow_repeats,
+                            record_dependencies=True, only_dependencies=rebuild)
+        for family in families:
+            room = max(0, sample_max - kept.get(family.__name__, 0))
+            with stage(f"schema_diff.families/{family.__name__}"):
+                samples = run_family(family, ctx, room, fingerprint(seed, sorted(rebuild)))
+            new_samples += samples
+            counts[family.__name__] = len(samples)
+
+    with stage("schema_diff.splice"):
+        shards = splice_shards(input_paths, output_dir, stale, new_samples)
+        if schema_path is not None:
+            write_json(jschema, schema_path)
+
+    return {"diff": diff, "families": counts, "shards": shards, "stages": cache.log}
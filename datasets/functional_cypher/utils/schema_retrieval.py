@@ -0,0 +1,264 @@
+"""Question-driven retrieval of a minimal subschema through an inverted index"""
+
+from typing import Any, List, Dict, Callable, Optional, Tuple
+import re
+from collections import defaultdict
+
+# Import local modules
+from utils.cypher_validator import load_structured_schema
+
+# Weights of a question token matching each kind of schema element
+WEIGHTS = {"node": 3.0, "rel": 2.0, "node_prop": 1.0, "rel_prop": 1.0}
+
+WORD = re.compile(r"[A-Za-z0-9]+")
+CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "by", "with", "and", "or", "is", "are",
+    "was", "were", "be", "what", "which", "who", "whom", "how", "many", "much", "list", "find",
+    "show", "return", "give", "me", "all", "that", "have", "has", "had", "their", "its", "it",
+    "do", "does", "did", "from", "at", "as", "top", "first", "most", "more", "than",
+    }
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count of a text, about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+def normalize_token(token: str) -> str:
+    """Lowercases a token and removes the common plural endings.
+    Words ending in -ies keep the -ie, schema names ending in -y are indexed with both forms."""
+    token = token.lower()
+    if len(token) > 4 and token.endswith(("sses", "xes", "ches", "shes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def split_identifier(name: str) -> List[str]:
+    """Splits a schema name such as 'imdbRating', 'ACTED_IN' or 'release_date' into normalized tokens."""
+    tokens = []
+    for part in re.split(r"[_\W]+", name):
+        tokens.extend(CAMEL.findall(part))
+    return [normalize_token(t) for t in tokens if t]
+
+
+def normalize_structured_schema(jschema: Any) -> Dict:
+    """Returns a structured schema whose properties use the 'datatype' key of Neo4jSchema.
+    The schemas of the text2cypher_schemas.csv files use 'type' instead."""
+    jschema = load_structured_schema(jschema)
+
+    def props(entries):
+        return [{"property": p["property"], "datatype": p.get("datatype", p.get("type", ""))} for p in entries]
+
+    return {
+        "node_props": {label: props(entries) for label, entries in jschema["node_props"].items()},
+        "rel_props": {rtype: props(entries) for rtype, entries in jschema["rel_props"].items()},
+        "relationships": jschema["relationships"],
+        }
+
+
+def tokenize_question(question: str) -> List[str]:
+    """Normalized tokens of a question, without stopwords."""
+    tokens = []
+    for word in WORD.findall(question):
+        tokens.extend(t for t in split_identifier(word) if t not in STOPWORDS)
+    return tokens
+
+
+class SchemaRetriever:
+    """Inverted index from tokens and synonyms to the labels, relationship types and properties of a schema.
+    Built once per schema, then queried per question."""
+
+    def __init__(self,
+                 jschema: Dict,
+                 synonyms: Optional[Dict[str, List[str]]] = None,
+                 token_counter: Callable[[str], int] = approx_tokens,
+                 ) -> None:
+        """
+        Input:
+        - jschema: structured schema with keys node_props, rel_props, relationships,
+        as a dictionary or as the structured_schema column of text2cypher_schemas.csv
+        - synonyms: question word -> schema words, e.g. {'film': ['movie'], 'directed': ['DIRECTED']}
+        - token_counter: function counting the tokens of a text, used for the budget
+        """
+        jschema = normalize_structured_schema(jschema)
+        self.jschema = jschema
+        self.token_counter = token_counter
+        self._first_relationship = {}
+        for rel in reversed(jschema["relationships"]):
+            self._first_relationship[rel["type"]] = rel
+        self._endpoints: Dict[str, List[str]] = defaultdict(list)
+        for rel in jschema["relationships"]:
+            for label in (rel["start"], rel["end"]):
+                if label not in self._endpoints[rel["type"]]:
+                    self._endpoints[rel["type"]].append(label)
+        self.index: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = defaultdict(list)
+
+        for label, props in jschema["node_props"].items():
+            self._add(label, ("node", (label,)))
+            for prop in props:
+                self._add(prop["property"], ("node_prop", (label, prop["property"])))
+
+        for rtype, props in jschema["rel_props"].items():
+            for prop in props:
+                self._add(prop["property"], ("rel_prop", (rtype, prop["property"])))
+
+        for rel in jschema["relationships"]:
+            self._add(rel["type"], ("rel", (rel["type"],)))
+
+        # Synonyms point to the elements of the schema words they stand for
+        for word, targets in (synonyms or {}).items():
+            key = normalize_token(word)
+            for target in targets:
+                for token in split_identifier(target):
+                    for element in list(self.index.get(token, [])):
+                        if element not in self.index[key]:
+                            self.index[key].append(element)
+
+        self.index = dict(self.index)
+
+    def _add(self, name: str, element: Tuple[str, Tuple[str, ...]]) -> None:
+        tokens = split_identifier(name)
+        # The whole name as well, e.g. 'imdbrating' for 'imdbRating'
+        joined = "".join(tokens)
+        tokens = tokens + [joined]
+        # 'category' is also reached from 'categories'
+        tokens += [t[:-1] + "ie" for t in tokens if len(t) > 3 and t.endswith("y")]
+        for token in set(tokens):
+            if element not in self.index[token]:
+                self.index[token].append(element)
+
+    #### Retrieval ####
+
+    def score(self, question: str) -> Dict[Tuple[str, Tuple[str, ...]], float]:
+        """Scores the schema elements matched by the tokens of the question."""
+        tokens = tokenize_question(question)
+        # Adjacent words as well, e.g. 'imdb rating' -> 'imdbrating'
+        tokens += [a + b for a, b in zip(tokens, tokens[1:])]
+
+        scores: Dict[Tuple[str, Tuple[str, ...]], float] = defaultdict(float)
+        for token in tokens:
+            for element in self.index.get(token, ()):
+                scores[element] += WEIGHTS[element[0]]
+        return scores
+
+    def retrieve(self,
+                 question: str,
+                 token_budget: Optional[int] = None,
+                 include_types: bool = False,
+                 ) -> Tuple[List[List[str]], List[List[str]]]:
+        """Selects the relevant nodes and relationships for a question, within token_budget tokens
+        of the subschema rendered with include_types.
+        Returns (nodes_info, relationships_info) in the format of build_minimal_subschema."""
+
+        scores = self.score(question)
+
+        # Labels are relevant directly, or through their properties
+        label_scores: Dict[str, float] = defaultdict(float)
+        matched_props: Dict[str, List[str]] = defaultdict(list)
+        rel_scores: Dict[str, float] = defaultdict(float)
+        for (kind, key), value in scores.items():
+            if kind == "node":
+                label_scores[key[0]] += value
+            elif kind == "node_prop":
+                label_scores[key[0]] += value
+                matched_props[key[0]].append(key[1])
+            else:
+                rel_scores[key[0]] += value
+
+        # Relationships connecting two relevant labels
+        for rel in self.jschema["relationships"]:
+            if rel["start"] in label_scores and rel["end"] in label_scores:
+                rel_scores[rel["type"]] += WEIGHTS["rel"] / 2
+
+        # Candidates are (tier, score, kind, entry, required relationship). The first tier holds every
+        # relationship with its end labels, and one property per label, the remaining properties
+        # only fill the leftover budget.
+        candidates: List[Tuple[int, float, str, List[str], Optional[str]]] = []
+        for label, value in label_scores.items():
+            props = sorted(set(matched_props[label]), key=lambda p: -scores[("node_prop", (label, p))])
+            if ("node", (label,)) in scores or not props:
+                props += [p["property"] for p in self.jschema["node_props"][label] if p["property"] not in props]
+            entries = [[label, prop] for prop in props] or [[label]]
+            candidates.extend((0 if i == 0 else 1, value, "node", entry, None) for i, entry in enumerate(entries))
+        for rtype, value in rel_scores.items():
+            candidates.append((0, value, "rel", [rtype], None))
+            # The start and end labels, so the relationship is not rendered without its nodes
+            for label in self._endpoints.get(rtype, []):
+                if label not in label_scores:
+                    candidates.append((0, value, "node", [label], rtype))
+
+        # Stable sort: the end labels follow their relationship
+        candidates.sort(key=lambda c: (c[0], -c[1]))
+
+        nodes_info, relationships_info = [], []
+        kept_rels, kept_labels = set(), set()
+        for _, _, kind, entry, required in candidates:
+            if required is not None and (required not in kept_rels or entry[0] in kept_labels):
+                continue
+            selected = (nodes_info + [entry], relationships_info) if kind == "node" \
+                else (nodes_info, relationships_info + [entry])
+            # The cost is measured on the rendered text, so the budget holds for any token_counter
+            if token_budget is not None \
+                    and self.token_counter(self.render(*selected, include_types=include_types)) > token_budget:
+                continue
+            nodes_info, relationships_info = selected
+            if kind == "node":
+                if required is not None:
+                    kept_labels.add(entry[0])
+            else:
+                kept_rels.add(entry[0])
+
+        return nodes_info, relationships_info
+
+    def render(self,
+               nodes_info: List[List[str]],
+               relationships_info: List[List[str]],
+               include_types: bool = False,
+               ) -> str:
+        """
+        Renders a selection in the format of build_minimal_subschema, more compactly:
+        the properties of a label share one line, and a relationship type is shown with every
+        start and end label pair whose labels are both selected (its first one if there is none).
+        """
+        datatypes = {(label, p["property"]): p["datatype"]
+                     for label, props in self.jschema["node_props"].items() for p in props}
+        label_props: Dict[str, List[str]] = {}
+        for entry in nodes_info:
+            props = label_props.setdefault(entry[0], [])
+            if len(entry) > 1 and (entry[0], entry[1]) in datatypes and entry[1] not in props:
+                props.append(entry[1])
+
+        def format_prop(label: str, prop: str) -> str:
+            return f"{prop}: {datatypes[(label, prop)]}" if include_types else prop
+
+        node_descriptions = [f"{label} {{{', '.join(format_prop(label, p) for p in props)}}}"
+                             for label, props in label_props.items()]
+
+        relations = []
+        for rtype in dict.fromkeys(entry[0] for entry in relationships_info):
+            triples = [rel for rel in self.jschema["relationships"] if rel["type"] == rtype
+                       and rel["start"] in label_props and rel["end"] in label_props]
+            if not triples and rtype in self._first_relationship:
+                triples = [self._first_relationship[rtype]]
+            relations.extend(f"{{'start': {rel['start']}, 'type': {rel['type']}, 'end': {rel['end']} }}"
+                             for rel in triples)
+
+        newline = "\n"
+        return f"""Relevant node labels and their properties {'(with datatypes)' if include_types else ''} are:
+{newline.join(node_descriptions)}
+
+Relevant relationships are:
+{newline.join(relations)}""".strip()
+
+    def subschema(self,
+                  question: str,
+                  token_budget: Optional[int] = None,
+                  include_types: bool = False,
+                  ) -> str:
+        """Renders the relevant part of the schema for a question, see render."""
+        nodes_info, relationships_info = self.retrieve(question, token_budget, include_types)
+        return self.render(nodes_info, relationships_info, include_types)
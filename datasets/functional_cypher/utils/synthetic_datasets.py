@@ -0,0 +1,221 @@
+"""Columnar loader for the synthetic text2cypher datasets"""
+
+from typing import List, Dict, Optional, Tuple
+import csv
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# The datasets folder of the repository
+DATASETS_DIR = Path(__file__).resolve().parents[2]
+
+DEFAULT_CACHE_DIR = Path(os.path.expanduser("~")) / ".cache" / "text2cypher"
+
+SCHEMAS_FILE = "text2cypher_schemas.csv"
+
+# Bump to invalidate the cached tables, e.g. after a change of the columns
+CACHE_VERSION = 2
+
+# One entry per file; model is the LLM that produced the last column of the rows.
+# Files with the same content in several sources (text2cypher_questions.csv) are read once,
+# see group_sources
+SOURCES = [
+    {"source": "synthetic_gpt4turbo_demodbs", "file": "text2cypher_gpt4turbo.csv", "model": "gpt-4-turbo"},
+    {"source": "synthetic_opus_demodbs", "file": "text2cypher_claudeopus.csv", "model": "claude-3-opus"},
+    {"source": "synthetic_opus_demodbs", "file": "text2cypher_questions.csv", "model": "gpt-4-turbo"},
+    {"source": "synthetic_gpt4o_demodbs", "file": "text2cypher_questions.csv", "model": "gpt-4-turbo"},
+    {"source": "synthetic_gemini_demodbs", "file": "gemini_questions.csv", "model": "gemini-1.5-pro"},
+    ]
+
+TEXT_COLUMNS = ["question", "cypher", "false_schema"]
+FLAG_COLUMNS = ["syntax_error", "timeout", "returns_results"]
+CATEGORY_COLUMNS = ["source", "sources", "file", "model", "type", "database"]
+SCHEMA_COLUMNS = ["schema", "structured_schema"]
+
+COLUMNS = CATEGORY_COLUMNS + TEXT_COLUMNS + FLAG_COLUMNS + SCHEMA_COLUMNS
+
+
+#### Readers ####
+
+def read_schemas(path: Path) -> Dict[str, Dict[str, str]]:
+    """Reads a text2cypher_schemas.csv file into {database: {schema, structured_schema}}."""
+    csv.field_size_limit(2**31 - 1)
+    with open(path, newline="", encoding="utf-8") as fp:
+        return {row["database"]: {"schema": row["schema"], "structured_schema": row["structured_schema"]}
+                for row in csv.DictReader(fp)}
+
+
+def file_md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def group_sources(datasets_dir: Path = DATASETS_DIR,
+                  sources: List[Dict[str, str]] = SOURCES
+                  ) -> List[Tuple[Dict[str, str], List[str]]]:
+    """Groups the entries whose files have the same content.
+    Returns (first entry, names of all the sources holding the file) per distinct file, in the order of SOURCES."""
+    groups: Dict[str, Tuple[Dict[str, str], List[str]]] = {}
+    for spec in sources:
+        key = file_md5(datasets_dir / spec["source"] / spec["file"])
+        if key not in groups:
+            groups[key] = (spec, [])
+        if spec["source"] not in groups[key][1]:
+            groups[key][1].append(spec["source"])
+    return list(groups.values())
+
+
+def read_source(datasets_dir: Path,
+                spec: Dict[str, str],
+                source_names: Optional[List[str]] = None,
+                ) -> pd.DataFrame:
+    """Reads one dataset file and adds the provenance columns.
+    source is the entry's source, sources lists all the sources holding the same file, comma separated."""
+    df = pd.read_csv(datasets_dir / spec["source"] / spec["file"], dtype=str, keep_default_na=False)
+    for column in TEXT_COLUMNS + FLAG_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    for column in FLAG_COLUMNS:
+        df[column] = df[column].map({"True": True, "False": False}).astype("boolean")
+    df["false_schema"] = df["false_schema"].where(df["false_schema"] != "")
+    df["source"] = spec["source"]
+    df["sources"] = ",".join(source_names or [spec["source"]])
+    df["file"] = spec["file"]
+    df["model"] = spec["model"]
+    return df
+
+
+def intern_schemas(df: pd.DataFrame,
+                   schemas: Dict[str, Dict[str, Dict[str, str]]]
+                   ) -> pd.DataFrame:
+    """Adds the schema columns as dictionary-encoded (categorical) columns.
+    Each distinct schema text is stored once, rows only keep an integer code."""
+
+    for column in SCHEMA_COLUMNS:
+        categories: Dict[str, int] = {}
+        by_key: Dict[tuple, int] = {}
+        for source, databases in schemas.items():
+            for database, entry in databases.items():
+                by_key[(source, database)] = categories.setdefault(entry[column], len(categories))
+
+        codes = [by_key.get(key, -1) for key in zip(df["source"], df["database"])]
+        df[column] = pd.Categorical.from_codes(codes, categories=list(categories))
+    return df
+
+
+def build_table(datasets_dir: Path = DATASETS_DIR,
+                sources: List[Dict[str, str]] = SOURCES
+                ) -> pd.DataFrame:
+    """Reads all the sources into one table with provenance and interned schema columns.
+    A file shared by several sources is read once, its rows list all of them in the sources column."""
+    frames = [read_source(datasets_dir, spec, names) for spec, names in group_sources(datasets_dir, sources)]
+    df = pd.concat(frames, ignore_index=True)
+
+    schemas = {spec["source"]: read_schemas(datasets_dir / spec["source"] / SCHEMAS_FILE)
+               for spec in sources}
+    df = intern_schemas(df, schemas)
+
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    return df[COLUMNS]
+
+
+#### Binary cache ####
+
+def has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def source_fingerprint(datasets_dir: Path = DATASETS_DIR,
+                       sources: List[Dict[str, str]] = SOURCES
+                       ) -> str:
+    """Hash of the source files paths, sizes and modification times."""
+    digest = hashlib.sha1(f"v{CACHE_VERSION};".encode("utf-8"))
+    paths = [datasets_dir / s["source"] / s["file"] for s in sources]
+    paths += [datasets_dir / s["source"] / SCHEMAS_FILE for s in sources]
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def cache_path(cache_dir: Path = DEFAULT_CACHE_DIR,
+               datasets_dir: Path = DATASETS_DIR,
+               sources: List[Dict[str, str]] = SOURCES
+               ) -> Path:
+    """Path of the cached table, Parquet if pyarrow is installed, pickle otherwise."""
+    suffix = "parquet" if has_pyarrow() else "pkl"
+    return Path(cache_dir) / f"synthetic_{source_fingerprint(datasets_dir, sources)}.{suffix}"
+
+
+def load_synthetic_datasets(cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                            datasets_dir: Path = DATASETS_DIR,
+                            sources: List[Dict[str, str]] = SOURCES,
+                            rebuild: bool = False,
+                            ) -> pd.DataFrame:
+    """Loads all the synthetic datasets into one table.
+    The table is cached on first use and reloaded from the cache while the sources are unchanged.
+    Pass cache_dir=None to skip the cache."""
+
+    if cache_dir is None:
+        return build_table(datasets_dir, sources)
+
+    path = cache_path(cache_dir, datasets_dir, sources)
+    if path.exists() and not rebuild:
+        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_pickle(path)
+
+    df = build_table(datasets_dir, sources)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+    return df
+
+
+def scan_synthetic_datasets(databases: Optional[List[str]] = None,
+                            models: Optional[List[str]] = None,
+                            sources: Optional[List[str]] = None,
+                            columns: Optional[List[str]] = None,
+                            cache_dir: Path = DEFAULT_CACHE_DIR,
+                            datasets_dir: Path = DATASETS_DIR,
+                            ) -> pd.DataFrame:
+    """Returns the rows of the given databases, models and sources, with the selected columns only.
+    With a Parquet cache the filters are pushed down to the reader,
+    so the rest of the table is never materialized.
+    A row matches the sources filter if any of its sources does, see group_sources."""
+
+    filters = []
+    if databases is not None:
+        filters.append(("database", "in", list(databases)))
+    if models is not None:
+        filters.append(("model", "in", list(models)))
+
+    path = cache_path(cache_dir, datasets_dir)
+    if not path.exists():
+        load_synthetic_datasets(cache_dir, datasets_dir)
+    parquet = path.suffix == ".parquet"
+    df = None if parquet else pd.read_pickle(path)
+
+    if sources is not None:
+        # The values of the sources column are read from the cache, the files are not hashed again
+        wanted = set(sources)
+        stored = pd.read_parquet(path, columns=["sources"])["sources"] if parquet else df["sources"]
+        values = [value for value in stored.unique() if wanted & set(value.split(","))]
+        filters.append(("sources", "in", values))
+
+    if parquet:
+        return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+    for column, _, values in filters:
+        df = df[df[column].isin(values)]
+    return df if columns is None else df[columns]
@@ -1,19 +1,23 @@
 """Collection of basic Python helper functions"""
 
 import json
-from typing import Any, List, Dict, Callable
-import pickle
+from typing import Any, List, Dict, Callable, Optional, Set
 import itertools
 from itertools import product, combinations
 import random
 from collections import defaultdict
 
+# Import local modules
+from utils.instrumentation import instrumented, traced, add_counts
+
 ### File handlers ###
 
+@instrumented()
 def write_json(an_object: List[Any], file_path: str ) -> None:
     """Writes a Python object to a json file."""
     with open(file_path, "w") as fp:
         json.dump(an_object, fp)
+        add_counts("utils.utilities.write_json", nbytes=fp.tell())
 
 
 def read_json(file_path: str) -> Any:
@@ -25,12 +29,14 @@ def read_json(file_path: str) -> Any:
 
 def write_pkl(an_object: Any, file_path: str) -> None:
     """Writes a Python object to a pickle file."""
+    import pickle
     with open(file_path, 'wb') as f:
         pickle.dump(an_object, f)
 
 
 def read_pkl(an_object: Any, file_path: str) -> Any:
     """Reads a pickle file."""
+    import pickle
     with open(file_path, 'rb') as f:
         an_object = pickle.load(f)
         return an_object
@@ -70,11 +76,86 @@ def flatten_list(nested_list: List[List]) -> List[str]:
     return flat_list
 
 
+### Schema dependencies of the samples ###
+
+def node_dependencies(label: str,
+                      prop: Optional[str] = None
+                      ) -> List[str]:
+    """Ids of the schema elements used by a sample: a node label and one of its properties."""
+    if prop is None:
+        return [f"node:{label}"]
+    return [f"node:{label}", f"node_prop:{label}.{prop}"]
+
+
+def rel_dependencies(rtype: str,
+                     prop: Optional[str] = None
+                     ) -> List[str]:
+    """Ids of the schema elements used by a sample: a relationship type and one of its properties."""
+    if prop is None:
+        return [f"rel:{rtype}"]
+    return [f"rel:{rtype}", f"rel_prop:{rtype}.{prop}"]
+
+
+def add_sample(sampler: List[Dict],
+               prompter: Callable[..., Dict],
+               params: tuple,
+               dependencies: Optional[List[str]],
+               record_dependencies: bool,
+               only_dependencies: Optional[Set[str]]
+               ) -> None:
+    """
+    Builds a sample with the prompter and appends it to the sampler.
+
+    Input:
+    - dependencies: schema elements of the sample, None if they are not tracked
+    - record_dependencies: if the dependencies are stored in the sample, under the Dependencies key
+    - only_dependencies: if given, the sample is only built if it depends on one of these elements
+    """
+    if only_dependencies is not None and only_dependencies.isdisjoint(dependencies):
+        return
+    sample = prompter(*params)
+    if record_dependencies:
+        sample["Dependencies"] = dependencies
+    sampler.append(sample)
+
+
 ### Helpers for building samples data ###
 
+@instrumented()
+def build_label_sampler(nodes: List[str],
+                        prompter: Callable[..., Dict],
+                        record_dependencies: bool = False,
+                        only_dependencies: Optional[Set[str]] = None,
+                        ) -> List[Dict]:
+    """
+    Build the samples for queries that involve one node label.
+
+    Input:
+    - nodes: list of node labels
+    - prompter: prompt builder function
+    - record_dependencies, only_dependencies: see add_sample
+
+    Output:
+    - fine-tuning data
+    """
+
+    track = record_dependencies or only_dependencies is not None
+    prompter = traced(prompter, "utils.utilities.prompter")
+    sampler = []
+
+    for label in nodes:
+        deps = node_dependencies(label) if track else None
+        add_sample(sampler, prompter, (label,), deps, record_dependencies, only_dependencies)
+
+    return sampler
+
+
+@instrumented()
 def build_node_sampler(nlist: List[List], 
                        prompter: Callable[..., Dict],
-                       allow_repeats: bool
+                       allow_repeats: bool,
+                       record_dependencies: bool = False,
+                       only_dependencies: Optional[Set[str]] = None,
                        ) -> List[Dict]:
     """
     Build the samples for queries that involve one node label with attribute, values.
@@ -84,6 +165,7 @@ def build_node_sampler(nlist: List[List],
     - prompter: prompt builder function
     - allow_repeats: if repeated entries with the same label, property pair 
     but different values are to be included or not
+    - record_dependencies, only_dependencies: see add_sample
 
     Output:
     - fine-tuning data
@@ -93,6 +175,7 @@ def build_node_sampler(nlist: List[List],
     seen = set()
     filtered = [e for e in nlist if (e[0], e[1]) not in seen and not seen.add((e[0], e[1]))]
 
+    prompter = traced(prompter, "utils.utilities.prompter")
     sampler = []
 
     if allow_repeats:
@@ -100,13 +183,16 @@ def build_node_sampler(nlist: List[List],
     else:
         entries = filtered
 
+    track = record_dependencies or only_dependencies is not None
     for entry in entries:
-        temp_dict = prompter(entry[0], entry[1], entry[2])
-        sampler.append(temp_dict)
+        deps = node_dependencies(entry[0], entry[1]) if track else None
+        add_sample(sampler, prompter, (entry[0], entry[1], entry[2]), deps,
+                   record_dependencies, only_dependencies)
 
     return sampler
     
 
+@instrumented()
 def get_property_pairs(nlist_1: List[List],
                        nlist_2: List[List],
                        same_node: bool,
@@ -149,11 +235,14 @@ def get_property_pairs(nlist_1: List[List],
     return output
     
 
+@instrumented()
 def build_nodes_property_pairs_sampler(nlist_1: List[List],
                                        nlist_2: List[List],
                                        prompter: Callable[..., Dict],
                                        same_node: bool,
                                        allow_repeats: bool,
+                                       record_dependencies: bool = False,
+                                       only_dependencies: Optional[Set[str]] = None,
                                        )-> List[Dict]:
     
     """
@@ -166,6 +255,7 @@ def build_nodes_property_pairs_sampler(nlist_1: List[List],
     - same_node: if label_1, label_2 can be the same or not
     - allow_repeats: if repeated entries with the same label, property pair 
     but different values are to be included or not
+    - record_dependencies, only_dependencies: see add_sample
 
     Output:
     - fine-tuning data
@@ -176,22 +266,28 @@ def build_nodes_property_pairs_sampler(nlist_1: List[List],
                                 same_node=same_node,
                                 allow_repeats=allow_repeats)
 
+    prompter = traced(prompter, "utils.utilities.prompter")
     sampler = []
 
+    track = record_dependencies or only_dependencies is not None
     for e in output:
+        deps = node_dependencies(e[0][0], e[0][1]) + node_dependencies(e[1][0], e[1][1]) if track else None
         if same_node:
-            temp_dict = prompter(e[0][0], e[0][1], e[0][2], e[1][1], e[1][2])
+            params = (e[0][0], e[0][1], e[0][2], e[1][1], e[1][2])
         else:
-            temp_dict = prompter(e[0][0], e[0][1], e[0][2], e[1][0], e[1][1], e[1][2])
+            params = (e[0][0], e[0][1], e[0][2], e[1][0], e[1][1], e[1][2])
 
-        sampler.append(temp_dict)
+        add_sample(sampler, prompter, params, deps, record_dependencies, only_dependencies)
 
     return sampler
     
     
+@instrumented()
 def build_nodes_pairs(nodes: List[str],
                       prompter: Callable[..., Dict],
                       allow_repeats: bool,
+                      record_dependencies: bool = False,
+                      only_dependencies: Optional[Set[str]] = None,
                       ) -> List[Dict]:
     """
     Builder for queries that involve two node labels.
@@ -201,6 +297,7 @@ def build_nodes_pairs(nodes: List[str],
     - prompter: prompt builder function
     - allow_repeats: if repeated entries with the same label, property pair 
     but different values are to be included or not
+    - record_dependencies, only_dependencies: see add_sample
 
     Output:
     - fine-tuning data
@@ -208,19 +305,24 @@ def build_nodes_pairs(nodes: List[str],
 
     output = list(product(nodes, nodes))
 
+    prompter = traced(prompter, "utils.utilities.prompter")
     sampler = []
 
+    track = record_dependencies or only_dependencies is not None
     for e in output:
-        temp_dict = prompter(e[0], e[1])
-
-        sampler.append(temp_dict)
+        deps = node_dependencies(e[0]) + node_dependencies(e[1]) if track else None
+        add_sample(sampler, prompter, (e[0], e[1]), deps, record_dependencies, only_dependencies)
 
     return sampler
     
 
+@instrumented()
 def build_relationships_samples(rel_list: List[Any],
                                 prompter: Callable[..., Dict],
-                                allow_repeats: bool) -> List[Dict]:
+                                allow_repeats: bool,
+                                record_dependencies: bool = False,
+                                only_dependencies: Optional[Set[str]] = None,
+                                ) -> List[Dict]:
     
     """
     Builds relationships based queries, with or without repeats.
@@ -232,6 +334,7 @@ def build_relationships_samples(rel_list: List[Any],
     - prompter: prompt builder function
     - allow_repeats: if repeated entries with the same start node, relationship type, end node 
     are to be included or not
+    - record_dependencies, only_dependencies: see add_sample
 
     Output:
     - fine-tuning data
@@ -248,21 +351,29 @@ def build_relationships_samples(rel_list: List[Any],
     else:
         rel_list = filtered
 
+    prompter = traced(prompter, "utils.utilities.prompter")
     sampler = []
 
+    track = record_dependencies or only_dependencies is not None
     for e in rel_list:
         for k, v in e[1].items():
             for kk, vv in e[4].items():
-                temp_dict = prompter(e[0], k, v, e[2], e[3], kk, vv)
-                sampler.append(temp_dict)
+                deps = (node_dependencies(e[0], k) + rel_dependencies(e[2])
+                        + node_dependencies(e[3], kk)) if track else None
+                add_sample(sampler, prompter, (e[0], k, v, e[2], e[3], kk, vv), deps,
+                           record_dependencies, only_dependencies)
 
 
     return sampler
     
 
+@instrumented()
 def build_relationships_props_samples(rel_list: List[Any],
                                 prompter: Callable[..., Dict],
-                                allow_repeats: bool) -> List[Dict]:
+                                allow_repeats: bool,
+                                record_dependencies: bool = False,
+                                only_dependencies: Optional[Set[str]] = None,
+                                ) -> List[Dict]:
     
     """
     Builds relationships with attributes based queries, with or without repeats.
@@ -273,6 +384,7 @@ def build_relationships_props_samples(rel_list: List[Any],
     are extracted from relationship instances
     - prompter: prompt builder function
     - allow_repeats: if repeated entries with the same start node, relationship type, end node are to be included or not
+    - record_dependencies, only_dependencies: see add_sample
 
     Output:
     - list of dictionaries with keys: Prompt, Question, Schema, Cypher
@@ -288,19 +400,24 @@ def build_relationships_props_samples(rel_list: List[Any],
     else:
         rel_list = filtered
 
+    prompter = traced(prompter, "utils.utilities.prompter")
     sampler = []
 
+    track = record_dependencies or only_dependencies is not None
     for e in rel_list:
         for k, v in e[1].items():
             for kk, vv in e[3].items():
                 for kkk, vvv in e[5].items():
-                    temp_dict = prompter(e[0], k, v, e[2], kk, vv, e[4], kkk, vvv)
-                    sampler.append(temp_dict)
+                    deps = (node_dependencies(e[0], k) + rel_dependencies(e[2], kk)
+                            + node_dependencies(e[4], kkk)) if track else None
+                    add_sample(sampler, prompter, (e[0], k, v, e[2], kk, vv, e[4], kkk, vvv), deps,
+                               record_dependencies, only_dependencies)
 
     return sampler
 
     
 
+@instrumented()
 def collect_samples(sampler: List[Dict], 
                     sample_max: int) -> List[Dict]:
     
@@ -0,0 +1,435 @@
+"""Pre-tokenization, caching and packing of the text2cypher samples for fine-tuning.
+
+The Prompt/Question/Schema/Cypher samples are formatted with the template of a notebook,
+tokenized once with a pluggable tokenizer and cached as a flat array of uint32 token ids
+with the offsets of every sample. The cache is memory-mapped when read, so training steps
+only slice it. Sequences are then packed into rows of max_length tokens, or grouped into
+batches of similar lengths, to minimize padding.
+
+Usage:
+    python data_packing.py --input trainer.json --output-dir packed --max-length 2048
+    python data_packing.py --input trainer.json --output-dir packed --tokenizer hf:bigcode/starcoder2-3b --mode bucket
+"""
+
+from typing import Any, List, Dict, Callable, Iterable, Iterator, Optional, Protocol, Tuple
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import statistics
+import sys
+from array import array
+
+CACHE_VERSION = 2
+
+
+#### Templates ####
+
+# System message of the HuggingFace notebooks
+SYSTEM_MESSAGE = """
+You are a text to Cypher query translator. {prompt}\n{schema}
+"""
+
+# Prompt of the unsloth-llama3 simple notebook
+ALPACA_PROMPT = """Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
+
+### Instruction:
+{}
+
+### Input:
+{}
+
+### Response:
+{}"""
+
+# Instruction of the unsloth-codestral and unsloth-llama3 chat notebooks
+CYPHER_INSTRUCTION = """Based on the Neo4j graph schema below, write a Cypher query that would answer the user's question:
+{schema}
+
+Question: {question}"""
+
+# System message of the unsloth-llama3 chat notebook
+LLAMA3_SYSTEM_MESSAGE = "Given an input question, convert it to a Cypher query. No pre-amble."
+
+# bos_token of the llama-3 chat template
+LLAMA3_BOS_TOKEN = "<|begin_of_text|>"
+
+
+def format_chat(sample: Dict[str, str],
+                eos_token: str = "</s>"
+                ) -> str:
+    """Renders a sample with the CHAT_TEMPLATE of the StarCoder2 and CodeLlama notebooks.
+    HuggingFace renders it with trim_blocks, which keeps the newline after every message."""
+    messages = [("system", SYSTEM_MESSAGE.format(prompt=sample["Prompt"], schema=sample["Schema"])),
+                ("user", sample["Question"]),
+                ("assistant", sample["Cypher"])]
+    return "".join(f"<|im_start|>{role}\n{content}<|im_end|>{eos_token}\n" for role, content in messages)
+
+
+def format_alpaca(sample: Dict[str, str],
+                  eos_token: str = "</s>"
+                  ) -> str:
+    """Renders a sample with the instruction prompt of the unsloth-llama3 simple notebook."""
+    instruction = f"{sample['Prompt']} {sample['Schema']}"
+    return ALPACA_PROMPT.format(instruction, sample["Question"], sample["Cypher"]) + eos_token
+
+
+def format_inst(sample: Dict[str, str],
+                eos_token: str = "</s>"
+                ) -> str:
+    """Renders a sample with the [INST] format of the unsloth-codestral notebook, which adds no eos_token."""
+    instruction = CYPHER_INSTRUCTION.format(schema=sample["Schema"], question=sample["Question"])
+    return f"[INST]{instruction}\n[/INST]\n{sample['Cypher']}"
+
+
+def format_llama3(sample: Dict[str, str],
+                  eos_token: str = "</s>"
+                  ) -> str:
+    """Renders a sample with the llama-3 chat template of the unsloth-llama3 chat notebook,
+    which trims the messages and ends them with <|eot_id|> instead of the eos_token."""
+    instruction = CYPHER_INSTRUCTION.format(schema=sample["Schema"], question=sample["Question"])
+    messages = [("system", LLAMA3_SYSTEM_MESSAGE),
+                ("user", f"{instruction}\nCypher query:"),
+                ("assistant", sample["Cypher"])]
+    return LLAMA3_BOS_TOKEN + "".join(f"<|start_header_id|>{role}<|end_header_id|>\n\n{content.strip()}<|eot_id|>"
+                                      for role, content in messages)
+
+
+TEMPLATES: Dict[str, Callable[[Dict[str, str], str], str]] = {
+    "chat": format_chat,
+    "alpaca": format_alpaca,
+    "inst": format_inst,
+    "llama3": format_llama3,
+    }
+
+
+#### Tokenizers ####
+
+class Tokenizer(Protocol):
+    """What the packing needs from a tokenizer."""
+
+    name: str
+    eos_token: str
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        ...
+
+
+class WhitespaceTokenizer:
+    """Offline stand-in for a real tokenizer: words and punctuation are hashed into a fixed vocabulary.
+    The lengths are close enough to a subword tokenizer to test the packing without downloading one."""
+
+    TOKEN = re.compile(r"\w+|[^\w\s]")
+
+    def __init__(self, vocab_size: int = 32_000) -> None:
+        self.vocab_size = vocab_size
+        self.name = f"whitespace-{vocab_size}"
+        self.eos_token = "</s>"
+        self._cache: Dict[str, int] = {}
+
+    def _id(self, token: str) -> int:
+        token_id = self._cache.get(token)
+        if token_id is None:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            # 0 and 1 are kept for padding and the end of sequence
+            token_id = self._cache[token] = 2 + int.from_bytes(digest, "little") % (self.vocab_size - 2)
+        return token_id
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        return [[self._id(t) for t in self.TOKEN.findall(text)] for text in texts]
+
+
+class HFTokenizer:
+    """Adapter for a HuggingFace tokenizer, e.g. HFTokenizer.from_pretrained('bigcode/starcoder2-3b')."""
+
+    def __init__(self, tokenizer: Any) -> None:
+        self.tokenizer = tokenizer
+        self.name = f"hf:{tokenizer.name_or_path}"
+        self.eos_token = tokenizer.eos_token
+
+    @classmethod
+    def from_pretrained(cls, name: str, **kwargs) -> "HFTokenizer":
+        from transformers import AutoTokenizer
+        return cls(AutoTokenizer.from_pretrained(name, **kwargs))
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        return self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+
+
+def load_tokenizer(spec: str) -> Tokenizer:
+    """'whitespace' or 'hf:<model name>'."""
+    if spec == "whitespace":
+        return WhitespaceTokenizer()
+    if spec.startswith("hf:"):
+        return HFTokenizer.from_pretrained(spec[3:])
+    raise ValueError(f"Unknown tokenizer {spec}, use 'whitespace' or 'hf:<model name>'.")
+
+
+#### Token cache ####
+
+def read_samples(path: str) -> List[Dict[str, str]]:
+    """Samples of a json list, as written by write_json, or of json lines."""
+    with open(path, encoding="utf-8") as fp:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in fp if line.strip()]
+        return json.load(fp)
+
+
+def cache_fingerprint(samples_path: str,
+                      tokenizer: Tokenizer,
+                      template: str,
+                      max_length: Optional[int],
+                      ) -> str:
+    """Hash of the inputs of a token cache: the samples file, the tokenizer, the template and the truncation."""
+    h = hashlib.sha256(json.dumps([CACHE_VERSION, tokenizer.name, template, max_length]).encode("utf-8"))
+    with open(samples_path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def build_token_cache(samples: Iterable[Dict[str, str]],
+                      tokenizer: Tokenizer,
+                      output_dir: str,
+                      template: str = "chat",
+                      max_length: Optional[int] = None,
+                      batch_size: int = 1024,
+                      fingerprint: str = "",
+                      ) -> Dict[str, Any]:
+    """
+    Tokenizes the samples in batches and writes the cache:
+    - tokens.bin: the token ids of all the samples, uint32
+    - offsets.bin: start of every sample in tokens.bin and the total, uint64
+    - meta.json: tokenizer, template, byte order and counts
+
+    Sequences longer than max_length are truncated.
+    Returns the meta data.
+    """
+    render = TEMPLATES[template]
+    os.makedirs(output_dir, exist_ok=True)
+    offsets = array("Q", [0])
+    truncated = 0
+
+    def flush(batch, fp):
+        nonlocal truncated
+        for ids in tokenizer.encode_batch([render(s, tokenizer.eos_token) for s in batch]):
+            if max_length is not None and len(ids) > max_length:
+                ids = ids[:max_length]
+                truncated += 1
+            array("I", ids).tofile(fp)
+            offsets.append(offsets[-1] + len(ids))
+
+    with open(os.path.join(output_dir, "tokens.bin"), "wb") as fp:
+        batch = []
+        for sample in samples:
+            batch.append(sample)
+            if len(batch) == batch_size:
+                flush(batch, fp)
+                batch = []
+        if batch:
+            flush(batch, fp)
+
+    with open(os.path.join(output_dir, "offsets.bin"), "wb") as fp:
+        offsets.tofile(fp)
+
+    meta = {"version": CACHE_VERSION, "fingerprint": fingerprint, "tokenizer": tokenizer.name,
+            "template": template, "max_length": max_length, "byteorder": sys.byteorder,
+            "samples": len(offsets) - 1, "tokens": offsets[-1], "truncated": truncated}
+    with open(os.path.join(output_dir, "meta.json"), "w") as fp:
+        json.dump(meta, fp, indent=2)
+    return meta
+
+
+class TokenDataset:
+    """Memory-mapped view of a token cache. dataset[i] is the list of token ids of sample i.
+    With numpy, the same files read as np.memmap(tokens.bin, dtype=np.uint32) and
+    np.fromfile(offsets.bin, dtype=np.uint64)."""
+
+    def __init__(self, cache_dir: str) -> None:
+        with open(os.path.join(cache_dir, "meta.json")) as fp:
+            self.meta = json.load(fp)
+        if self.meta.get("version") != CACHE_VERSION or self.meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"Incompatible token cache in {cache_dir}.")
+
+        self.offsets = array("Q")
+        with open(os.path.join(cache_dir, "offsets.bin"), "rb") as fp:
+            self.offsets.frombytes(fp.read())
+
+        self._fp = open(os.path.join(cache_dir, "tokens.bin"), "rb")
+        if self.offsets[-1]:
+            self._mmap = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+            self.tokens = memoryview(self._mmap).cast("I")
+        else:
+            self._mmap = None
+            self.tokens = memoryview(array("I"))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> List[int]:
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    @property
+    def lengths(self) -> List[int]:
+        offsets = self.offsets
+        return [offsets[i + 1] - offsets[i] for i in range(len(offsets) - 1)]
+
+    def close(self) -> None:
+        self.tokens.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._fp.close()
+
+    def __enter__(self) -> "TokenDataset":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_or_build_cache(samples_path: str,
+                        tokenizer: Tokenizer,
+                        cache_dir: str,
+                        template: str = "chat",
+                        max_length: Optional[int] = None,
+                        ) -> TokenDataset:
+    """Opens the token cache of a samples file, tokenizing it only if the inputs changed."""
+    fingerprint = cache_fingerprint(samples_path, tokenizer, template, max_length)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as fp:
+            if json.load(fp).get("fingerprint") == fingerprint:
+                return TokenDataset(cache_dir)
+    build_token_cache(read_samples(samples_path), tokenizer, cache_dir, template, max_length,
+                      fingerprint=fingerprint)
+    return TokenDataset(cache_dir)
+
+
+#### Packing and bucketing ####
+
+def pack_sequences(lengths: List[int],
+                   max_length: int
+                   ) -> List[List[int]]:
+    """Packs sequences into rows of at most max_length tokens with best-fit decreasing:
+    the longest sequences are placed first, each in the fullest row it still fits in.
+    Returns the sample indices of every row."""
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    rows: List[List[int]] = []
+    # Remaining capacities of the open rows, sorted, with the matching row ids
+    capacities: List[int] = []
+    row_ids: List[int] = []
+
+    for i in order:
+        length = lengths[i]
+        k = bisect.bisect_left(capacities, length)
+        if k < len(capacities):
+            row = row_ids.pop(k)
+            remaining = capacities.pop(k) - length
+        else:
+            row = len(rows)
+            rows.append([])
+            remaining = max_length - length
+        rows[row].append(i)
+        if remaining > 0:
+            k = bisect.bisect_left(capacities, remaining)
+            capacities.insert(k, remaining)
+            row_ids.insert(k, row)
+    return rows
+
+
+def length_buckets(lengths: List[int],
+                   batch_size: int,
+                   seed: int = 0,
+                   ) -> List[List[int]]:
+    """Groups sequences of similar lengths into batches, in a shuffled batch order.
+    Returns the sample indices of every batch."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+    random.Random(seed).shuffle(batches)
+    return batches
+
+
+def iter_packed_rows(dataset: TokenDataset,
+                     rows: List[List[int]]
+                     ) -> Iterator[Tuple[List[int], List[int]]]:
+    """Yields the token ids of every packed row with the start of each sequence in the row,
+    e.g. for position ids or a block-diagonal attention mask."""
+    for row in rows:
+        tokens, starts = [], []
+        for i in row:
+            starts.append(len(tokens))
+            tokens.extend(dataset[i])
+        yield tokens, starts
+
+
+#### Statistics ####
+
+def percentile(values: List[int], q: float) -> int:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0
+
+
+def token_stats(lengths: List[int],
+                groups: List[List[int]],
+                mode: str,
+                max_length: Optional[int] = None,
+                ) -> Dict[str, Any]:
+    """Length distribution and padding of packed rows (mode 'pack', rows of max_length)
+    or of length-bucketed batches (mode 'bucket', padded to their longest sequence)."""
+    tokens = sum(lengths)
+    if mode == "pack":
+        slots = len(groups) * max_length
+    else:
+        slots = sum(len(g) * max(lengths[i] for i in g) for g in groups)
+    return {
+        "samples": len(lengths),
+        "tokens": tokens,
+        "min": min(lengths, default=0),
+        "mean": statistics.fmean(lengths) if lengths else 0.0,
+        "p50": percentile(lengths, 0.5),
+        "p90": percentile(lengths, 0.9),
+        "p99": percentile(lengths, 0.99),
+        "max": max(lengths, default=0),
+        "mode": mode,
+        "groups": len(groups),
+        "padding_tokens": slots - tokens,
+        "efficiency": tokens / slots if slots else 1.0,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", required=True, help="samples as a json list or json lines")
+    parser.add_argument("--output-dir", required=True, help="directory of the token cache and the packing plan")
+    parser.add_argument("--tokenizer", default="whitespace", help="'whitespace' or 'hf:<model name>'")
+    parser.add_argument("--template", default="chat", choices=list(TEMPLATES))
+    parser.add_argument("--max-length", type=int, default=2048)
+    parser.add_argument("--mode", default="pack", choices=["pack", "bucket"])
+    parser.add_argument("--batch-size", type=int, default=8, help="batch size of the bucket mode")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tokenizer = load_tokenizer(args.tokenizer)
+    with load_or_build_cache(args.input, tokenizer, args.output_dir, args.template, args.max_length) as dataset:
+        lengths = dataset.lengths
+
+    if args.mode == "pack":
+        groups = pack_sequences(lengths, args.max_length)
+    else:
+        groups = length_buckets(lengths, args.batch_size, args.seed)
+    stats = token_stats(lengths, groups, args.mode, args.max_length)
+
+    with open(os.path.join(args.output_dir, f"{args.mode}_plan.json"), "w") as fp:
+        json.dump({"mode": args.mode, "max_length": args.max_length, "groups": groups}, fp)
+    with open(os.path.join(args.output_dir, "stats.json"), "w") as fp:
+        json.dump(stats, fp, indent=2)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())